@@ -0,0 +1,102 @@
+"""Batch screenplay analysis
+
+Parses and analyzes screenplay files on all cores and writes one JSON line
+per screenplay to stdout, with the throughput on stderr:
+    
+    python batch_analyze.py archive/ extra.txt [--workers 8] [--style cinematic]
+
+With --enqueue a film job is queued in MongoDB for every analyzed
+screenplay, to be picked up by the workers (see worker.py).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules.batch_analysis import BatchAnalyzer
+
+logger = logging.getLogger("batch_analyze")
+
+SCREENPLAY_SUFFIXES = ('.txt', '.fountain')
+
+def collect_files(paths: List[str]) -> List[Path]:
+    """Expand directories into the screenplay files they contain"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.is_file() and p.suffix.lower() in SCREENPLAY_SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+def read_screenplays(files: List[Path], style: str, texts: Optional[Dict[int, str]] = None):
+    """Yield (screenplay, style) pairs; texts keeps each screenplay by index until its result is handled"""
+    for index, path in enumerate(files):
+        screenplay = path.read_text(encoding='utf-8', errors='replace')
+        if texts is not None:
+            texts[index] = screenplay
+        yield screenplay, style
+
+async def run(args) -> int:
+    files = collect_files(args.paths)
+    batch_analyzer = BatchAnalyzer(max_workers=args.workers)
+    
+    if args.enqueue:
+        # Only needed (and only requires MONGO_URL) when queueing jobs
+        from server import db, job_queue, new_film_job, client
+    
+    start = time.monotonic()
+    analyzed = 0
+    # Screenplays in flight, so enqueued jobs reuse the text read for analysis
+    texts: Optional[Dict[int, str]] = {} if args.enqueue else None
+    try:
+        async for result in batch_analyzer.analyze(read_screenplays(files, args.style, texts)):
+            path = files[result['index']]
+            screenplay = texts.pop(result['index']) if texts is not None else None
+            line = {'file': str(path)}
+            
+            if 'error' in result:
+                line['error'] = result['error']
+            else:
+                analyzed += 1
+                line.update({
+                    'scene_count': result['scene_count'],
+                    'characters': result['characters'],
+                    'analysis_time': result['analysis_time']
+                })
+                if args.enqueue:
+                    job_dict = new_film_job(screenplay, args.style, args.quality, analyzed_scenes=result['scenes'])
+                    job_dict.update(job_queue.queue_fields())
+                    await db.film_jobs.insert_one(job_dict)
+                    line['job_id'] = job_dict['id']
+            
+            print(json.dumps(line), flush=True)
+    finally:
+        batch_analyzer.shutdown()
+        if args.enqueue:
+            client.close()
+    
+    duration = time.monotonic() - start
+    print(f"Analyzed {analyzed}/{len(files)} screenplays in {duration:.2f}s "
+          f"({analyzed * 60 / duration if duration else 0:.0f} scripts/min, {batch_analyzer.max_workers} processes)",
+          file=sys.stderr)
+    return 0 if analyzed == len(files) else 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help="Screenplay files or directories")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--style', default='cinematic')
+    parser.add_argument('--quality', default='medium')
+    parser.add_argument('--enqueue', action='store_true', help="Queue a film job for every analyzed screenplay")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark CloudStorageManager S3 throughput against a local S3 stand-in
+
+    python benchmarks/bench_cloud_storage.py [--size-mb 64] [--concurrency 1 4 8] [--objects 2000]
+
+Starts moto's threaded server (pip install 'moto[server]') unless
+--endpoint-url points at another S3-compatible server such as MinIO.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.cloud_storage import CloudStorageManager
+
+def start_moto() -> str:
+    from moto.server import ThreadedMotoServer
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    return f"http://{host}:{port}"
+
+def new_manager(args, concurrency: int) -> CloudStorageManager:
+    return CloudStorageManager('aws_s3', {
+        'bucket_name': args.bucket,
+        'region': 'us-east-1',
+        'endpoint_url': args.endpoint_url,
+        'access_key': args.access_key,
+        'secret_key': args.secret_key,
+        'part_size': args.part_mb * 1024 * 1024,
+        'max_concurrency': concurrency
+    })
+
+async def bench_uploads(args, local_path: str) -> None:
+    size_mb = os.path.getsize(local_path) / 1024 / 1024
+    for concurrency in args.concurrency:
+        manager = new_manager(args, concurrency)
+        start = time.perf_counter()
+        await manager.upload_file(local_path, f"bench/upload-{concurrency}.bin")
+        duration = time.perf_counter() - start
+        print(f"{f'upload, {concurrency} parallel parts':<32} {size_mb / duration:>10,.1f} MB/s  "
+              f"({manager.parts_uploaded} parts, {duration:.2f}s)")
+
+async def bench_objects(args) -> None:
+    manager = new_manager(args, max(args.concurrency))
+    client = manager._s3()
+    keys = [f"bench/objects/{n:06d}" for n in range(args.objects)]
+    
+    def put_all(keys):
+        for key in keys:
+            client.put_object(Bucket=args.bucket, Key=key, Body=b'x')
+    
+    await asyncio.to_thread(put_all, keys)
+    start = time.perf_counter()
+    listed = sum([1 async for _ in manager.iter_files('bench/objects/')])
+    duration = time.perf_counter() - start
+    print(f"{'list (paginated)':<32} {listed / duration:>10,.0f} objects/s  ({listed} objects)")
+    
+    start = time.perf_counter()
+    failed = await manager.delete_files(keys)
+    duration = time.perf_counter() - start
+    print(f"{'delete (DeleteObjects batches)':<32} {len(keys) / duration:>10,.0f} objects/s  ({len(failed)} failed)")
+    
+    sample = keys[:min(200, len(keys))]
+    await asyncio.to_thread(put_all, sample)
+    start = time.perf_counter()
+    await asyncio.to_thread(lambda: [client.delete_object(Bucket=args.bucket, Key=key) for key in sample])
+    duration = time.perf_counter() - start
+    print(f"{'delete (one request per object)':<32} {len(sample) / duration:>10,.0f} objects/s  ({len(sample)} objects)")
+
+async def run(args) -> None:
+    await asyncio.to_thread(new_manager(args, 1)._s3().create_bucket, Bucket=args.bucket)
+    with tempfile.NamedTemporaryFile(suffix='.bin') as f:
+        for _ in range(args.size_mb):
+            f.write(os.urandom(1024 * 1024))
+        f.flush()
+        await bench_uploads(args, f.name)
+    await bench_objects(args)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--endpoint-url', help="S3-compatible server; starts moto if omitted")
+    parser.add_argument('--access-key', default='testing')
+    parser.add_argument('--secret-key', default='testing')
+    parser.add_argument('--bucket', default=f"bench-{uuid.uuid4().hex[:8]}")
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--part-mb', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--objects', type=int, default=2000)
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    if not args.endpoint_url:
+        args.endpoint_url = start_moto()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark SceneParser throughput in lines per second
+
+    python benchmarks/bench_scene_parser.py [--lines 20000] [--repeat 5]
+"""
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.scene_parser import SceneParser
+
+SCENE_TEMPLATE = """INT. WAREHOUSE {n} - NIGHT
+CAMERA: slow dolly in
+LIGHT: single bare bulb, hard shadows
+SOUND: rain on the metal roof
+Anna steps through the doorway and scans the dark room.
+ANNA
+Is anybody here? I got your message.
+A figure moves behind the crates, barely visible.
+MARCUS
+You came alone. Good.
+Anna reaches slowly for the flashlight in her coat.
+
+"""
+
+def build_screenplay(target_lines: int) -> str:
+    lines_per_scene = SCENE_TEMPLATE.count('\n')
+    scenes = max(1, target_lines // lines_per_scene)
+    return ''.join(SCENE_TEMPLATE.format(n=n) for n in range(scenes))
+
+def measure(label: str, line_count: int, repeat: int, run) -> None:
+    best = float('inf')
+    scenes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scenes = run()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {line_count / best:>12,.0f} lines/s  ({scenes} scenes, best of {repeat}: {best * 1000:.1f} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    screenplay = build_screenplay(args.lines)
+    line_count = screenplay.count('\n')
+    scene_parser = SceneParser()
+    
+    measure("parse(text)", line_count, args.repeat, lambda: len(scene_parser.parse(screenplay)))
+    measure("iter_scenes(file lines)", line_count, args.repeat,
+            lambda: sum(1 for _ in scene_parser.iter_scenes(io.StringIO(screenplay))))
+    
+    # Time until the first scene is available to downstream stages
+    start = time.perf_counter()
+    next(scene_parser.iter_scenes(io.StringIO(screenplay)))
+    print(f"{'time to first scene':<28} {(time.perf_counter() - start) * 1e6:>12,.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import logging
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from modules.media_store import MediaStore
+
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+    """Index of synthesized speech already in the media store
+    
+    Entries are keyed by a hash of (model, voice, text) and map to the media
+    reference, duration and size of the clip, so a clip is stored once, in
+    the MediaStore, and reused by reference. The index is held in memory and
+    persisted as one small file per entry under index_dir. Once the clips it
+    references exceed max_disk_bytes, the least recently used entries are
+    dropped; their clips are deleted by the media store's garbage collection
+    (see MediaStore.collect) once no job references them either.
+    
+    There is no in-memory tier for the audio itself: a hit returns the
+    reference, never the bytes, and clips are read from disk by ffmpeg and
+    the media endpoint, so cached bytes in memory would have no reader.
+    """
+    
+    def __init__(self, media_store: MediaStore, index_dir: str, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.media_store = media_store
+        self.index_dir = index_dir
+        self.max_disk_bytes = max_disk_bytes
+        os.makedirs(self.index_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()  # key -> entry, oldest first
+        self._disk_bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._load_index()
+    
+    @staticmethod
+    def make_key(model: str, voice: str, text: str) -> str:
+        """Build the cache key for a synthesized line"""
+        payload = json.dumps([model, voice, text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the cached clip ({'audio_ref', 'duration'}), or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+        
+        if entry is None or not self.media_store.exists(entry['audio_ref']):
+            with self._lock:
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+            return None
+        
+        try:
+            os.utime(self._path_for(key))  # Persist recency across restarts
+            # Keep the clip out of garbage collection until the job using it has saved it
+            os.utime(self.media_store.path_for(entry['audio_ref']))
+        except OSError:
+            pass
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return {'audio_ref': entry['audio_ref'], 'duration': entry['duration']}
+    
+    def put(self, key: str, audio_ref: str, duration: Optional[float]):
+        """Record a clip stored in the media store"""
+        entry = {'audio_ref': audio_ref, 'duration': duration, 'size': self.media_store.size(audio_ref)}
+        path = self._path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write atomically so a restart never loads a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        with self._lock:
+            self._forget_entry(key)
+            self._entries[key] = entry
+            self._disk_bytes += entry['size']
+            self._evict()
+    
+    def referenced_refs(self) -> Set[str]:
+        """Media references of all entries on disk, including those written by other processes"""
+        refs = set()
+        for root, _, files in os.walk(self.index_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(root, name)) as f:
+                        refs.add(json.load(f)['audio_ref'])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return refs
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and index size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'disk_bytes': self._disk_bytes
+            }
+    
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.index_dir, key[:2], f"{key}.json")
+    
+    def _load_index(self):
+        """Rebuild the LRU index from entry files on disk, oldest first"""
+        entries = []
+        for root, _, files in os.walk(self.index_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith('.tmp'):
+                    os.remove(path)  # Leftover from an interrupted write
+                    continue
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(path) as f:
+                        entry = json.load(f)
+                    if 'size' not in entry:
+                        # Written before sizes were recorded
+                        entry['size'] = self.media_store.size(entry['audio_ref'])
+                    entries.append((os.stat(path).st_mtime, name[:-5], entry))
+                except (OSError, ValueError, KeyError):
+                    os.remove(path)  # Unreadable, or its clip is gone
+        
+        with self._lock:
+            for _, key, entry in sorted(entries, key=lambda item: item[0]):
+                self._entries[key] = entry
+                self._disk_bytes += entry['size']
+            self._evict()
+        logger.info(f"Audio cache loaded {len(self._entries)} entries ({self._disk_bytes} bytes) from {self.index_dir}")
+    
+    def _forget_entry(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry['size']
+    
+    def _forget(self, key: str):
+        self._forget_entry(key)
+        try:
+            os.remove(self._path_for(key))
+        except OSError:
+            pass
+    
+    def _evict(self):
+        """Drop least recently used entries until their clips fit in max_disk_bytes"""
+        while self._disk_bytes > self.max_disk_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._forget(key)
+            self.evictions += 1
@@ -0,0 +1,116 @@
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bitrates in kbps by (MPEG-1?, layer), indexed by the header's bitrate index
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+}
+# Sample rates by header version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000)
+}
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """Duration of MP3 audio in seconds, read from frame headers without decoding
+    
+    Uses the frame count of a Xing/Info/VBRI header when present and
+    otherwise walks the frame headers. Returns None if no MPEG audio frame
+    is found.
+    """
+    offset = _skip_id3(data)
+    first = _find_frame(data, offset)
+    if first is None:
+        return None
+    
+    position, header = first
+    samples_per_frame, sample_rate = header[2], header[3]
+    
+    frame_count = _vbr_frame_count(data, position, header)
+    if frame_count is not None:
+        return frame_count * samples_per_frame / sample_rate
+    
+    frames = 0
+    while header is not None:
+        frames += 1
+        position += header[0]
+        header = _parse_header(data, position)
+    return frames * samples_per_frame / sample_rate
+
+def _skip_id3(data: bytes) -> int:
+    """Offset of the first byte after an ID3v2 tag"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] & 0x7f) << 21 | (data[7] & 0x7f) << 14 | (data[8] & 0x7f) << 7 | (data[9] & 0x7f)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def _find_frame(data: bytes, offset: int) -> Optional[Tuple[int, Tuple[int, int, int, int, bool, bool]]]:
+    """First position with two consecutive valid frame headers (guards against false syncs)"""
+    position = data.find(b'\xff', offset)
+    while position != -1:
+        header = _parse_header(data, position)
+        if header is not None:
+            following = position + header[0]
+            if following >= len(data) or _parse_header(data, following) is not None:
+                return position, header
+        position = data.find(b'\xff', position + 1)
+    return None
+
+def _parse_header(data: bytes, position: int) -> Optional[Tuple[int, int, int, int, bool, bool]]:
+    """Parse the frame header at position
+    
+    Returns (frame length, layer, samples per frame, sample rate, MPEG-1?,
+    mono?) or None if there is no valid header there.
+    """
+    if position + 4 > len(data):
+        return None
+    b1, b2, b3 = data[position + 1], data[position + 2], data[position + 3]
+    if data[position] != 0xff or b1 & 0xe0 != 0xe0:
+        return None
+    
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    mono = (b3 >> 6) == 3
+    
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples_per_frame = 1152 if layer == 2 or mpeg1 else 576
+        frame_length = (samples_per_frame // 8) * bitrate // sample_rate + padding
+    
+    return frame_length, layer, samples_per_frame, sample_rate, mpeg1, mono
+
+def _vbr_frame_count(data: bytes, position: int, header: Tuple[int, int, int, int, bool, bool]) -> Optional[int]:
+    """Frame count from a Xing/Info or VBRI header in the first frame"""
+    _, layer, _, _, mpeg1, mono = header
+    if layer == 3:
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = position + 4 + side_info
+        if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+            flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+            if flags & 0x01:
+                return int.from_bytes(data[xing + 8:xing + 12], 'big')
+    
+    vbri = position + 36
+    if data[vbri:vbri + 4] == b'VBRI' and len(data) >= vbri + 18:
+        return int.from_bytes(data[vbri + 14:vbri + 18], 'big')
+    return None
@@ -0,0 +1,137 @@
+import logging
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+from modules.scene_parser import SceneParser
+from modules.scene_analyzer import SceneAnalyzer
+from modules.character_ai import CharacterIndex
+
+logger = logging.getLogger(__name__)
+
+# Per-process parser and analyzer, created once by the pool initializer
+_scene_parser: Optional[SceneParser] = None
+_scene_analyzer: Optional[SceneAnalyzer] = None
+
+def _init_worker():
+    global _scene_parser, _scene_analyzer
+    # Per-scene INFO logs from every worker process would drown the batch output
+    logging.disable(logging.INFO)
+    _scene_parser = SceneParser()
+    _scene_analyzer = SceneAnalyzer()
+
+def analyze_screenplay(screenplay: str, style: str = 'cinematic') -> Dict[str, Any]:
+    """Parse and analyze one screenplay (runs in a worker process)"""
+    start = time.perf_counter()
+    scenes = _scene_analyzer.analyze_scenes(_scene_parser.parse(screenplay), style)
+    characters = CharacterIndex(scenes)
+    return {
+        'scenes': scenes,
+        'scene_count': len(scenes),
+        'characters': list(characters.characters.values()),
+        'analysis_time': time.perf_counter() - start
+    }
+
+class BatchAnalyzer:
+    """Parses and analyzes many screenplays on a process pool across all cores"""
+    
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Screenplays handed to the pool at once; bounds memory for large archives
+        self.max_pending = max_pending or self.max_workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+        
+        self.scripts_analyzed = 0
+        self.scripts_failed = 0
+        self.scenes_analyzed = 0
+        self.busy_time = 0.0
+    
+    async def analyze(self, screenplays: Iterable[Tuple[str, str]]) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze (screenplay, style) pairs, yielding results as they complete
+        
+        Each result carries the index of its screenplay in the input, plus
+        either the analysis or an error message. If a pool process dies, the
+        screenplays it had in flight fail and a new pool takes the rest.
+        """
+        loop = asyncio.get_running_loop()
+        pending = {}  # future -> (index, pool)
+        items = enumerate(screenplays)
+        start = time.monotonic()
+        
+        try:
+            while True:
+                for index, (screenplay, style) in items:
+                    future = self._submit(loop, screenplay, style)
+                    pending[future] = index, self._pool
+                    if len(pending) >= self.max_pending:
+                        break
+                
+                if not pending:
+                    break
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index, pool = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            self._discard_pool(pool)
+                        self.scripts_failed += 1
+                        logger.error(f"Error analyzing screenplay {index}: {str(e)}")
+                        yield {'index': index, 'error': str(e)}
+                        continue
+                    
+                    self.scripts_analyzed += 1
+                    self.scenes_analyzed += result['scene_count']
+                    yield {'index': index, **result}
+        finally:
+            for future in pending:
+                future.cancel()
+            self.busy_time += time.monotonic() - start
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throughput counters"""
+        return {
+            'workers': self.max_workers,
+            'scripts_analyzed': self.scripts_analyzed,
+            'scripts_failed': self.scripts_failed,
+            'scenes_analyzed': self.scenes_analyzed,
+            'scripts_per_minute': self.scripts_analyzed * 60 / self.busy_time if self.busy_time else 0.0
+        }
+    
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def _submit(self, loop: asyncio.AbstractEventLoop, screenplay: str, style: str) -> asyncio.Future:
+        try:
+            return loop.run_in_executor(self._get_pool(), analyze_screenplay, screenplay, style)
+        except BrokenProcessPool as e:
+            # A process died since the last submission; this screenplay fails, the next one gets a new pool
+            self._discard_pool(self._pool)
+            future = loop.create_future()
+            future.set_exception(e)
+            return future
+    
+    def _discard_pool(self, pool: Optional[ProcessPoolExecutor]):
+        """Shut down a broken pool so the next submission starts a new one"""
+        if pool is not None and pool is self._pool:
+            logger.warning("Batch analysis pool broke (a worker process died); starting a new pool")
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn instead of fork: the API process runs threads (executors, database driver)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            logger.info(f"Started batch analysis pool with {self.max_workers} processes")
+        return self._pool
@@ -1,48 +1,93 @@
 import logging
-from typing import Dict, Set, List
+import hashlib
+import sys
+from bisect import insort
+from typing import Any, Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
-class CharacterAI:
-    """Manages character information and consistency"""
+def voice_order(character: str, voices: List[str]) -> List[str]:
+    """All voices in the character's order of preference, starting at the one its name hashes to"""
+    digest = hashlib.sha1(character.encode('utf-8')).digest()
+    start = int.from_bytes(digest[:8], 'big') % len(voices)
+    return voices[start:] + voices[:start]
+
+def cast_voices(characters: Iterable[str], voices: List[str], taken: Iterable[str] = ()) -> Dict[str, str]:
+    """Give each character the first voice in its preference order not yet taken by the cast
+    
+    Characters are cast in name order, so the same cast always gets the same
+    voices. Once every voice is taken, characters share their preferred voice.
+    """
+    taken = set(taken)
+    voice_mapping = {}
+    for character in sorted(characters):
+        order = voice_order(character, voices)
+        voice_mapping[character] = next((voice for voice in order if voice not in taken), order[0])
+        taken.add(voice_mapping[character])
+    return voice_mapping
+
+class CharacterIndex:
+    """Character profiles for the scenes of one job
     
-    def __init__(self):
-        self.characters: Dict[str, Dict] = {}
+    Built in a single pass over the dialogs of each scene. Scenes can be added
+    or replaced later (by scene number); only the changed scenes are indexed
+    again. Character names are interned, since every dialog line repeats them.
+    """
     
-    def extract_characters(self, scenes: List[Dict]) -> Dict[str, Dict]:
-        """Extract unique characters from all scenes"""
+    def __init__(self, scenes: Optional[Iterable[Dict[str, Any]]] = None):
+        # Profiles in order of first appearance
+        self.characters: Dict[str, Dict[str, Any]] = {}
+        # scene_number -> {character: dialog count in that scene}
+        self._scene_counts: Dict[int, Dict[str, int]] = {}
+        if scenes:
+            self.update(scenes)
+    
+    def update(self, scenes: Iterable[Dict[str, Any]]) -> List[str]:
+        """Index new or changed scenes; returns the characters seen for the first time"""
         try:
-            all_characters: Set[str] = set()
-            
+            new_characters = []
             for scene in scenes:
-                if 'characters' in scene:
-                    all_characters.update(scene['characters'])
-            
-            # Create character profiles
-            for char_name in all_characters:
-                if char_name not in self.characters:
-                    self.characters[char_name] = {
-                        'name': char_name,
-                        'scenes': [],
-                        'dialog_count': 0
-                    }
-            
-            # Track character appearances
-            for scene in scenes:
-                for char in scene.get('characters', []):
-                    if char in self.characters:
-                        self.characters[char]['scenes'].append(scene['scene_number'])
-                        self.characters[char]['dialog_count'] += len([
-                            d for d in scene.get('dialogs', []) if d['character'] == char
-                        ])
-            
-            logger.info(f"Extracted {len(self.characters)} characters")
-            return self.characters
+                scene_number = scene['scene_number']
+                if scene_number in self._scene_counts:
+                    self.remove_scene(scene_number)
+                
+                counts: Dict[str, int] = {}
+                for name in scene.get('characters', []):
+                    counts[sys.intern(name)] = 0
+                for dialog in scene.get('dialogs', []):
+                    name = sys.intern(dialog['character'])
+                    counts[name] = counts.get(name, 0) + 1
+                self._scene_counts[scene_number] = counts
+                
+                for name, dialog_count in counts.items():
+                    profile = self.characters.get(name)
+                    if profile is None:
+                        profile = self.characters[name] = {
+                            'name': name,
+                            'scenes': [],
+                            'dialog_count': 0
+                        }
+                        new_characters.append(name)
+                    insort(profile['scenes'], scene_number)
+                    profile['dialog_count'] += dialog_count
             
+            if new_characters:
+                logger.info(f"Indexed {len(new_characters)} new characters ({len(self.characters)} total)")
+            return new_characters
+        
         except Exception as e:
-            logger.error(f"Error extracting characters: {str(e)}")
+            logger.error(f"Error indexing characters: {str(e)}")
             raise
     
+    def remove_scene(self, scene_number: int):
+        """Drop a scene's contribution to the character profiles"""
+        for name, dialog_count in self._scene_counts.pop(scene_number, {}).items():
+            profile = self.characters[name]
+            profile['scenes'].remove(scene_number)
+            profile['dialog_count'] -= dialog_count
+            if not profile['scenes']:
+                del self.characters[name]
+    
     def get_character_info(self, character_name: str) -> Dict:
         """Get information about a specific character"""
-        return self.characters.get(character_name, {})
\ No newline at end of file
+        return self.characters.get(character_name, {})
@@ -1,17 +1,31 @@
 import logging
-from typing import Dict, Any, Optional
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Any, Iterable, List
 import os
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# S3 requires multipart parts (except the last) to be at least 5 MB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+# Smaller uploads use a single PutObject
+DEFAULT_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+# Most keys a single DeleteObjects request accepts
+DELETE_BATCH_SIZE = 1000
+
 class CloudStorageManager:
-    """Cloud storage manager - prepared for AWS S3, GCS, Azure integration
+    """Cloud storage manager - AWS S3 and local storage implemented, prepared for GCS, Azure integration
     
-    This module is prepared for future cloud storage integration.
-    When you're ready to implement cloud storage:
+    S3 (or any S3-compatible server via 'endpoint_url') uses one boto3
+    client per manager, so transfers share its connection pool. The 'local'
+    provider keeps files in a content-addressed MediaStore ('media_store' or
+    'root_dir' in config) served under 'base_url'; there, paths only supply
+    the file extension and files are addressed by their media reference.
+    To add the other providers:
     
     1. Install required SDK:
-       - AWS S3: pip install boto3
        - Google Cloud: pip install google-cloud-storage
        - Azure: pip install azure-storage-blob
     
@@ -24,10 +38,23 @@ class CloudStorageManager:
         self.provider = provider
         self.config = config
         self.client = None
+        if provider == 'local':
+            from modules.media_store import MediaStore
+            self.client = config.get('media_store') or MediaStore(config['root_dir'])
+            self.base_url = config.get('base_url', '/api/media').rstrip('/')
+        # Multipart transfer settings; memory per streaming upload is bounded by
+        # max(multipart_threshold, part_size * (max_concurrency + 1))
+        self.part_size = max(MIN_PART_SIZE, int(config.get('part_size', DEFAULT_PART_SIZE)))
+        self.multipart_threshold = max(self.part_size, int(config.get('multipart_threshold', DEFAULT_MULTIPART_THRESHOLD)))
+        self.max_concurrency = max(1, int(config.get('max_concurrency', 4)))
+        
+        self.bytes_uploaded = 0
+        self.parts_uploaded = 0
+        self.files_deleted = 0
         
         logger.info(f"CloudStorageManager initialized for {provider}")
-        logger.info("Note: Cloud storage is prepared but not yet fully implemented")
-        logger.info("Install provider SDK when ready to use")
+        if provider not in ('aws_s3', 'local'):
+            logger.info("Note: Only AWS S3 and local storage are implemented so far; install provider SDK when ready to use")
     
     async def upload_file(self, local_path: str, cloud_path: str) -> str:
         """Upload file to cloud storage
@@ -41,6 +68,8 @@ class CloudStorageManager:
         """
         if self.provider == 'aws_s3':
             return await self._upload_to_s3(local_path, cloud_path)
+        elif self.provider == 'local':
+            return await self._upload_to_local(local_path, cloud_path)
         elif self.provider == 'gcs':
             return await self._upload_to_gcs(local_path, cloud_path)
         elif self.provider == 'azure_blob':
@@ -48,32 +77,160 @@ class CloudStorageManager:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
-    async def _upload_to_s3(self, local_path: str, cloud_path: str) -> str:
-        """Upload to AWS S3
+    async def upload_stream(self, chunks: AsyncIterator[bytes], cloud_path: str, content_type: str = 'video/mp4') -> str:
+        """Upload content arriving in chunks without buffering it whole or on disk
         
-        To implement:
-        1. pip install boto3
-        2. Uncomment code below
-        3. Configure AWS credentials
+        Content below multipart_threshold is uploaded with a single request.
+        Larger content is cut into parts of part_size and up to
+        max_concurrency parts are uploaded at once; reading pauses while all
+        upload slots are busy.
+        
+        Returns:
+            URL of the uploaded object
         """
-        logger.info(f"Would upload {local_path} to S3: {cloud_path}")
+        if self.provider == 'local':
+            return await self._upload_stream_to_local(chunks, cloud_path)
+        if self.provider != 'aws_s3':
+            raise NotImplementedError(f"Streaming upload not implemented for {self.provider}")
         
-        # TODO: Implement when ready
-        # import boto3
-        # s3_client = boto3.client(
-        #     's3',
-        #     aws_access_key_id=self.config['access_key'],
-        #     aws_secret_access_key=self.config['secret_key'],
-        #     region_name=self.config['region']
-        # )
-        # 
-        # bucket = self.config['bucket_name']
-        # s3_client.upload_file(local_path, bucket, cloud_path)
-        # 
-        # url = f"https://{bucket}.s3.{self.config['region']}.amazonaws.com/{cloud_path}"
-        # return url
+        client = self._s3()
+        bucket = self.config['bucket_name']
+        buffer = bytearray()
+        upload_id = None
+        parts: List[asyncio.Task] = []
+        slots = asyncio.Semaphore(self.max_concurrency)
+        
+        async def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+            try:
+                response = await asyncio.to_thread(
+                    client.upload_part, Bucket=bucket, Key=cloud_path, UploadId=upload_id, PartNumber=part_number, Body=body
+                )
+            finally:
+                slots.release()
+            self.parts_uploaded += 1
+            self.bytes_uploaded += len(body)
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        
+        try:
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    buffer += chunk
+                    if upload_id is None:
+                        if len(buffer) < self.multipart_threshold:
+                            continue
+                        response = await asyncio.to_thread(
+                            client.create_multipart_upload, Bucket=bucket, Key=cloud_path, ContentType=content_type
+                        )
+                        upload_id = response['UploadId']
+                    while len(buffer) >= self.part_size:
+                        body = bytes(buffer[:self.part_size])
+                        del buffer[:self.part_size]
+                        await slots.acquire()
+                        # Stop reading the source as soon as a part has failed
+                        for part in parts:
+                            if part.done() and part.exception():
+                                raise part.exception()
+                        parts.append(asyncio.create_task(upload_part(len(parts) + 1, body)))
+            
+            if upload_id is None:
+                await asyncio.to_thread(
+                    client.put_object, Bucket=bucket, Key=cloud_path, Body=bytes(buffer), ContentType=content_type
+                )
+                self.bytes_uploaded += len(buffer)
+            else:
+                if buffer:
+                    await slots.acquire()
+                    parts.append(asyncio.create_task(upload_part(len(parts) + 1, bytes(buffer))))
+                completed = await asyncio.gather(*parts)
+                await asyncio.to_thread(
+                    client.complete_multipart_upload, Bucket=bucket, Key=cloud_path, UploadId=upload_id,
+                    MultipartUpload={'Parts': completed}
+                )
+            
+            logger.info(f"Uploaded {cloud_path} to S3 in {max(1, len(parts))} part(s)")
+            return self._s3_url(cloud_path)
+        
+        except BaseException:
+            for part in parts:
+                part.cancel()
+            await asyncio.gather(*parts, return_exceptions=True)
+            if upload_id is not None:
+                # Uploaded parts are billed until the multipart upload is aborted
+                await asyncio.to_thread(client.abort_multipart_upload, Bucket=bucket, Key=cloud_path, UploadId=upload_id)
+            raise
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get upload counters"""
+        return {
+            'provider': self.provider,
+            'bytes_uploaded': self.bytes_uploaded,
+            'parts_uploaded': self.parts_uploaded,
+            'files_deleted': self.files_deleted
+        }
+    
+    def _s3(self):
+        """S3 client shared by all transfers of this manager
+        
+        Set 'endpoint_url' to use an S3-compatible server such as MinIO or
+        moto's server mode instead of AWS.
+        """
+        if self.client is None:
+            import boto3
+            from botocore.config import Config
+            self.client = boto3.client(
+                's3',
+                endpoint_url=self.config.get('endpoint_url'),
+                aws_access_key_id=self.config.get('access_key'),
+                aws_secret_access_key=self.config.get('secret_key'),
+                region_name=self.config.get('region'),
+                config=Config(max_pool_connections=self.max_concurrency * 2, retries={'mode': 'standard'})
+            )
+        return self.client
+    
+    def _s3_url(self, cloud_path: str) -> str:
+        bucket = self.config['bucket_name']
+        if self.config.get('endpoint_url'):
+            return f"{self.config['endpoint_url'].rstrip('/')}/{bucket}/{cloud_path}"
+        return f"https://{bucket}.s3.{self.config['region']}.amazonaws.com/{cloud_path}"
+    
+    async def _upload_to_s3(self, local_path: str, cloud_path: str) -> str:
+        """Upload to AWS S3, in parallel parts above multipart_threshold"""
+        content_type = 'video/mp4' if local_path.endswith('.mp4') else 'application/octet-stream'
+        return await self.upload_stream(self._read_chunks(local_path), cloud_path, content_type)
+    
+    async def _read_chunks(self, local_path: str) -> AsyncIterator[bytes]:
+        with open(local_path, 'rb') as f:
+            while chunk := await asyncio.to_thread(f.read, self.part_size):
+                yield chunk
+    
+    async def _upload_to_local(self, local_path: str, cloud_path: str) -> str:
+        """Copy into the local media store"""
+        def put_file() -> str:
+            with open(local_path, 'rb') as f:
+                return self.client.put_stream(iter(lambda: f.read(1024 * 1024), b''), self._extension(cloud_path))
+        
+        ref = await asyncio.to_thread(put_file)
+        self.bytes_uploaded += self.client.size(ref)
+        return f"{self.base_url}/{ref}"
+    
+    async def _upload_stream_to_local(self, chunks: AsyncIterator[bytes], cloud_path: str) -> str:
+        """Write chunks to the local media store as they arrive, each write in a thread"""
+        writer = self.client.writer(self._extension(cloud_path))
+        try:
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    await asyncio.to_thread(writer.write, chunk)
+                    self.bytes_uploaded += len(chunk)
+            ref = await asyncio.to_thread(writer.commit)
+        except BaseException:
+            writer.discard()
+            raise
         
-        raise NotImplementedError("AWS S3 upload not yet implemented")
+        logger.info(f"Stored {cloud_path} locally as {ref}")
+        return f"{self.base_url}/{ref}"
+    
+    def _extension(self, cloud_path: str) -> str:
+        return os.path.splitext(cloud_path)[1].lstrip('.') or 'bin'
     
     async def _upload_to_gcs(self, local_path: str, cloud_path: str) -> str:
         """Upload to Google Cloud Storage
@@ -123,10 +280,69 @@ class CloudStorageManager:
     
     async def delete_file(self, cloud_path: str) -> bool:
         """Delete file from cloud storage"""
-        logger.info(f"Would delete from cloud: {cloud_path}")
-        raise NotImplementedError("Delete not yet implemented")
+        return not await self.delete_files([cloud_path])
+    
+    async def delete_files(self, cloud_paths: Iterable[str]) -> List[str]:
+        """Delete files in batches of up to DELETE_BATCH_SIZE per request
+        
+        Returns:
+            Paths that could not be deleted
+        """
+        if self.provider == 'local':
+            return await asyncio.to_thread(self._delete_local, list(cloud_paths))
+        if self.provider != 'aws_s3':
+            raise NotImplementedError(f"Delete not implemented for {self.provider}")
+        
+        client = self._s3()
+        paths = list(cloud_paths)
+        failed = []
+        for i in range(0, len(paths), DELETE_BATCH_SIZE):
+            batch = paths[i:i + DELETE_BATCH_SIZE]
+            response = await asyncio.to_thread(
+                client.delete_objects,
+                Bucket=self.config['bucket_name'],
+                Delete={'Objects': [{'Key': path} for path in batch], 'Quiet': True}
+            )
+            errors = response.get('Errors', [])
+            if errors:
+                logger.error(f"Error deleting {len(errors)} of {len(batch)} files from S3, "
+                             f"e.g. {errors[0]['Key']}: {errors[0].get('Message', errors[0].get('Code'))}")
+            failed.extend(error['Key'] for error in errors)
+            self.files_deleted += len(batch) - len(errors)
+        return failed
+    
+    def _delete_local(self, cloud_paths: List[str]) -> List[str]:
+        """Delete from the local media store; paths may be references or their URLs"""
+        failed = []
+        for path in cloud_paths:
+            try:
+                self.client.delete(os.path.basename(path))
+                self.files_deleted += 1
+            except (ValueError, OSError) as e:
+                logger.error(f"Error deleting {path} from local storage: {str(e)}")
+                failed.append(path)
+        return failed
+    
+    async def iter_files(self, prefix: str = "") -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over files in cloud storage, fetching one page at a time"""
+        if self.provider == 'local':
+            for ref in await asyncio.to_thread(lambda: [ref for ref in self.client.refs() if ref.startswith(prefix)]):
+                stat = await asyncio.to_thread(os.stat, self.client.path_for(ref))
+                yield {'path': ref, 'size': stat.st_size, 'etag': ref.split('.')[0], 'last_modified': datetime.fromtimestamp(stat.st_mtime, timezone.utc)}
+            return
+        if self.provider != 'aws_s3':
+            raise NotImplementedError(f"List not implemented for {self.provider}")
+        
+        client = self._s3()
+        request = {'Bucket': self.config['bucket_name'], 'Prefix': prefix}
+        while True:
+            page = await asyncio.to_thread(client.list_objects_v2, **request)
+            for item in page.get('Contents', []):
+                yield {'path': item['Key'], 'size': item['Size'], 'etag': item['ETag'].strip('"'), 'last_modified': item['LastModified']}
+            if not page.get('IsTruncated'):
+                break
+            request['ContinuationToken'] = page['NextContinuationToken']
     
     async def list_files(self, prefix: str = "") -> list:
         """List files in cloud storage"""
-        logger.info(f"Would list files with prefix: {prefix}")
-        raise NotImplementedError("List not yet implemented")
\ No newline at end of file
+        return [item async for item in self.iter_files(prefix)]
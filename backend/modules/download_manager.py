@@ -0,0 +1,179 @@
+import logging
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Network errors (including truncated bodies) after which a download is resumed from where it stopped
+RESUMABLE_ERRORS = (httpx.TransportError,)
+
+class DownloadManager:
+    """Concurrent, resumable downloads over one pooled HTTP client
+    
+    Files are downloaded to '<path>.part' and renamed into place once the
+    body matches its Content-Length, so a path never holds a partial file.
+    Interrupted downloads continue with an HTTP Range request where the
+    server supports it. Throughput counts the time any download or stream
+    was in progress.
+    """
+    
+    def __init__(self, max_concurrent: int = 4, chunk_size: int = 1024 * 1024, timeout: float = 60.0,
+                 max_retries: int = 3, retry_delay: float = 1.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        self.files_downloaded = 0
+        self.bytes_downloaded = 0
+        self.resumed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self._active = 0
+        self._busy_since = 0.0
+    
+    async def download(self, url: str, path: str) -> Dict[str, Any]:
+        """Download url to path, resuming after network errors
+        
+        Returns the path and size of the file.
+        """
+        async with self._slots:
+            start = time.monotonic()
+            temp_path = f"{path}.part"
+            attempt = 0
+            while True:
+                try:
+                    with self._busy():
+                        size = await self._fetch(url, temp_path)
+                    break
+                except RESUMABLE_ERRORS as e:
+                    if attempt >= self.max_retries:
+                        self.failed += 1
+                        raise
+                    attempt += 1
+                    self.resumed += 1
+                    logger.warning(f"Download of {url} interrupted, resuming (attempt {attempt}): {str(e)}")
+                    await asyncio.sleep(self.retry_delay * (2 ** (attempt - 1)))
+                except Exception:
+                    self.failed += 1
+                    raise
+            
+            os.replace(temp_path, path)
+            duration = time.monotonic() - start
+            self.files_downloaded += 1
+            logger.info(f"Downloaded {url} ({size / 1e6:.1f} MB in {duration:.2f}s)")
+            return {'url': url, 'path': path, 'size': size, 'duration': duration}
+    
+    async def download_all(self, downloads: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Download (url, path) pairs concurrently; failed downloads give None
+        
+        Logs the aggregate throughput of the batch.
+        """
+        start = time.monotonic()
+        
+        async def download_one(url: str, path: str) -> Optional[Dict[str, Any]]:
+            try:
+                return await self.download(url, path)
+            except Exception as e:
+                logger.error(f"Error downloading {url}: {str(e)}")
+                return None
+        
+        results = await asyncio.gather(*(download_one(url, path) for url, path in downloads))
+        
+        duration = time.monotonic() - start
+        total_bytes = sum(result['size'] for result in results if result)
+        logger.info(f"Downloaded {sum(1 for result in results if result)}/{len(downloads)} files, "
+                    f"{total_bytes / 1e6:.1f} MB at {total_bytes / 1e6 / duration if duration else 0:.1f} MB/s")
+        return list(results)
+    
+    async def stream(self, url: str) -> AsyncIterator[bytes]:
+        """Yield the body of url in chunks, for passing it on without writing it to disk"""
+        async with self._slots:
+            with self._busy():
+                async with self._get_client().stream('GET', url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        self.bytes_downloaded += len(chunk)
+                        yield chunk
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get download counters and aggregate throughput"""
+        busy_time = self.busy_time + (time.monotonic() - self._busy_since if self._active else 0.0)
+        return {
+            'files_downloaded': self.files_downloaded,
+            'bytes_downloaded': self.bytes_downloaded,
+            'resumed': self.resumed,
+            'failed': self.failed,
+            'mb_per_second': self.bytes_downloaded / 1e6 / busy_time if busy_time else 0.0
+        }
+    
+    async def aclose(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+    
+    @contextmanager
+    def _busy(self) -> Iterator[None]:
+        """Track wall time during which at least one transfer is in progress"""
+        if not self._active:
+            self._busy_since = time.monotonic()
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            if not self._active:
+                self.busy_time += time.monotonic() - self._busy_since
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrent, max_keepalive_connections=self.max_concurrent)
+            )
+        return self._client
+    
+    async def _fetch(self, url: str, temp_path: str) -> int:
+        """Fetch into temp_path, continuing a partial file; returns the size"""
+        offset = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+        # Byte ranges and Content-Length refer to the body as sent, so ask for it uncompressed
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+        
+        async with self._get_client().stream('GET', url, headers=headers) as response:
+            if response.status_code == 416:
+                # Nothing left to fetch: the partial file is already complete
+                return offset
+            response.raise_for_status()
+            
+            if offset and response.status_code == 206:
+                mode = 'ab'
+            else:
+                offset = 0  # Server ignored the range: start over
+                mode = 'wb'
+            
+            expected_size = response.headers.get('Content-Length')
+            received = 0
+            # Chunks are written from a thread so disk writes never block the event loop
+            f = await asyncio.to_thread(open, temp_path, mode)
+            try:
+                async for chunk in response.aiter_raw(self.chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+                    received += len(chunk)
+                    self.bytes_downloaded += len(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+            
+            if expected_size is not None and received != int(expected_size):
+                raise httpx.RemoteProtocolError(f"Incomplete body: {received} of {expected_size} bytes", request=response.request)
+        
+        return offset + received
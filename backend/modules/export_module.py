@@ -2,24 +2,38 @@ import logging
 import os
 import asyncio
 from typing import List, Dict, Any, Optional
-import requests
+from modules.film_assembler import FilmAssembler
+from modules.download_manager import DownloadManager
+from modules.render_engine import QUALITY_RESOLUTIONS
 
 logger = logging.getLogger(__name__)
 
+# Reported when the render resolution is unknown (demo renders, unmapped quality)
+DEFAULT_RESOLUTION = '1024x576'
+
 class ExportModule:
     """Exports final film - supports direct URLs and cloud storage"""
     
-    def __init__(self):
+    def __init__(self, assembler: Optional[FilmAssembler] = None, downloader: Optional[DownloadManager] = None):
         self.output_dir = "/app/backend/generated_films"
         os.makedirs(self.output_dir, exist_ok=True)
         self.cloud_storage = None  # Will be initialized when cloud storage is configured
+        # Assembles scenes and dialog into one film file; None returns scene URLs only
+        self.assembler = assembler
+        self.downloader = downloader or DownloadManager()
     
-    async def export_film(self, scenes: List[Dict[str, Any]], timeline: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Export complete film - returns URLs for direct streaming"""
+    async def export_film(self, scenes: List[Dict[str, Any]], timeline: List[Dict[str, Any]],
+                          job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Export complete film - returns URLs for direct streaming, plus the assembled film if enabled
+        
+        With cloud storage enabled, scene videos are also copied there and
+        each scene gets the copy's 'stored_video_url'.
+        """
         try:
             logger.info("Starting film export")
             
             # Collect all video URLs from scenes
+            scene_durations = {entry['scene_number']: entry['duration'] for entry in timeline}
             scene_videos = []
             for scene in scenes:
                 video_url = scene.get('video_url', '')
@@ -27,21 +41,40 @@ class ExportModule:
                     scene_videos.append({
                         'scene_number': scene['scene_number'],
                         'video_url': video_url,
-                        'duration': scene.get('duration', 5)
+                        'duration': scene_durations.get(scene['scene_number'], scene.get('duration', 5))
                     })
             
             export_info = {
                 'status': 'completed',
-                'storage_type': 'replicate_urls',  # or 'cloud_storage' when implemented
+                'storage_type': 'replicate_urls',  # or 'cloud_storage' once scene videos are copied
                 'scene_videos': scene_videos,
                 'total_scenes': len(scenes),
                 'total_duration': sum(t['duration'] for t in timeline),
                 'format': 'MP4',
-                'resolution': '1024x576',
+                'resolution': self._render_resolution(scenes),
                 'download_urls': [v['video_url'] for v in scene_videos],
-                'cloud_storage_enabled': False  # Will be True when cloud storage is configured
+                'cloud_storage_enabled': self.cloud_storage is not None
             }
             
+            if self.cloud_storage and job_id and scene_videos:
+                stored_urls = await asyncio.gather(*(
+                    self.upload_to_cloud(video['video_url'], video['scene_number'], job_id) for video in scene_videos
+                ))
+                stored_by_scene = {}
+                for video, stored_url in zip(scene_videos, stored_urls):
+                    if stored_url:
+                        video['stored_video_url'] = stored_by_scene[video['scene_number']] = stored_url
+                for scene in scenes:
+                    if scene['scene_number'] in stored_by_scene:
+                        scene['stored_video_url'] = stored_by_scene[scene['scene_number']]
+                if stored_by_scene:
+                    export_info['storage_type'] = 'cloud_storage'
+            
+            if self.assembler and job_id and scene_videos:
+                export_info['assembly'] = await self._assemble(scenes, timeline, job_id)
+                if export_info['assembly'].get('resolution'):
+                    export_info['resolution'] = export_info['assembly']['resolution']
+            
             logger.info(f"Film export completed: {len(scene_videos)} scenes available")
             return export_info
             
@@ -49,36 +82,50 @@ class ExportModule:
             logger.error(f"Error exporting film: {str(e)}")
             raise
     
-    async def download_scene_videos(self, scenes: List[Dict[str, Any]]) -> List[str]:
-        """Download scene videos locally (optional, for backup)"""
-        video_paths = []
-        
+    async def _assemble(self, scenes: List[Dict[str, Any]], timeline: List[Dict[str, Any]], job_id: str) -> Dict[str, Any]:
+        """Download scene videos and assemble them into one film; failures only affect the assembly"""
+        work_dir = os.path.join(self.output_dir, job_id)
+        try:
+            video_paths = await self.download_scene_videos(scenes, work_dir)
+            assembly = await self.assembler.assemble(video_paths, timeline, work_dir)
+            return {'status': 'completed', **assembly}
+        except Exception as e:
+            logger.error(f"Film assembly failed for job {job_id}: {str(e)}")
+            return {'status': 'failed', 'error': str(e)}
+    
+    def _render_resolution(self, scenes: List[Dict[str, Any]]) -> str:
+        """Resolution the scenes were rendered at, or DEFAULT_RESOLUTION if unknown (demo renders)"""
         for scene in scenes:
-            video_url = scene.get('video_url', '')
-            if video_url and not video_url.startswith('placeholder'):
-                try:
-                    response = requests.get(video_url, stream=True)
-                    video_path = os.path.join(self.output_dir, f"scene_{scene['scene_number']}.mp4")
-                    
-                    with open(video_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                    
-                    video_paths.append(video_path)
-                    logger.info(f"Downloaded scene {scene['scene_number']} to {video_path}")
-                except Exception as e:
-                    logger.error(f"Error downloading scene {scene['scene_number']}: {str(e)}")
+            if not scene.get('is_demo') and scene.get('quality') in QUALITY_RESOLUTIONS:
+                width, height = QUALITY_RESOLUTIONS[scene['quality']]
+                return f"{width}x{height}"
+        return DEFAULT_RESOLUTION
+    
+    async def download_scene_videos(self, scenes: List[Dict[str, Any]], output_dir: Optional[str] = None) -> Dict[int, str]:
+        """Download scene videos locally and concurrently, returning the file per scene number"""
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        
+        downloads = [
+            (scene['scene_number'], scene['video_url'], os.path.join(output_dir, f"scene_{scene['scene_number']}.mp4"))
+            for scene in scenes
+            if scene.get('video_url') and not scene['video_url'].startswith('placeholder')
+        ]
+        results = await self.downloader.download_all([(url, path) for _, url, path in downloads])
         
-        return video_paths
+        return {
+            scene_number: result['path']
+            for (scene_number, _, _), result in zip(downloads, results)
+            if result
+        }
     
     def enable_cloud_storage(self, provider: str, config: Dict[str, Any]):
         """Enable cloud storage (AWS S3, Google Cloud Storage, etc.)
         
-        This method is prepared for future cloud storage integration.
+        Scene videos are then copied to the storage on export.
         
         Args:
-            provider: 'aws_s3', 'gcs', 'azure_blob'
+            provider: 'aws_s3', 'local', 'gcs', 'azure_blob'
             config: Provider-specific configuration
         
         Example usage:
@@ -93,31 +140,20 @@ class ExportModule:
         self.cloud_storage = CloudStorageManager(provider, config)
         logger.info(f"Cloud storage enabled: {provider}")
     
-    async def upload_to_cloud(self, video_url: str, scene_number: int) -> Optional[str]:
-        """Upload video to cloud storage (prepared for future use)"""
+    async def upload_to_cloud(self, video_url: str, scene_number: int, job_id: Optional[str] = None) -> Optional[str]:
+        """Stream a scene video from its URL into cloud storage
+        
+        The download body is passed straight into a multipart upload, so
+        memory stays bounded and nothing is written to local disk.
+        """
         if not self.cloud_storage:
             logger.warning("Cloud storage not enabled")
             return None
         
         try:
-            # Download video temporarily
-            response = requests.get(video_url)
-            temp_path = f"/tmp/scene_{scene_number}.mp4"
-            
-            with open(temp_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Upload to cloud
-            cloud_url = await self.cloud_storage.upload_file(
-                temp_path,
-                f"films/scene_{scene_number}.mp4"
-            )
-            
-            # Cleanup
-            os.remove(temp_path)
-            
-            return cloud_url
+            cloud_path = f"films/{job_id}/scene_{scene_number}.mp4" if job_id else f"films/scene_{scene_number}.mp4"
+            return await self.cloud_storage.upload_stream(self.downloader.stream(video_url), cloud_path)
             
         except Exception as e:
             logger.error(f"Error uploading to cloud: {str(e)}")
-            return None
\ No newline at end of file
+            return None
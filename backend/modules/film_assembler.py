@@ -0,0 +1,209 @@
+import logging
+import asyncio
+import json
+import math
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from modules.media_store import MediaStore
+
+logger = logging.getLogger(__name__)
+
+# Video codecs that can be stream-copied into an MP4 container
+MP4_COPY_CODECS = ('h264', 'hevc', 'mpeg4', 'av1', 'vp9')
+# Stream properties that must match for the concat demuxer to copy without re-encoding
+COPY_COMPATIBLE_FIELDS = ('codec_name', 'width', 'height', 'pix_fmt', 'r_frame_rate', 'time_base')
+
+class FilmAssembler:
+    """Assembles scene videos and timeline dialog clips into one MP4 with ffmpeg
+    
+    When all scene videos share codec, resolution and frame rate they are
+    joined with the concat demuxer and stream copy; otherwise they are scaled
+    to the first video's format and re-encoded. Dialog clips are mixed in at
+    their timeline positions. ffmpeg runs as a subprocess, at most
+    max_concurrent at a time.
+    """
+    
+    def __init__(self, media_store: MediaStore, max_concurrent: int = 2, ffmpeg: str = 'ffmpeg', ffprobe: str = 'ffprobe'):
+        self.media_store = media_store
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self._slots = asyncio.Semaphore(max(1, max_concurrent))
+        
+        self.films_assembled = 0
+        self.stream_copies = 0
+        self.output_seconds = 0.0
+        self.assembly_seconds = 0.0
+    
+    async def assemble(self, video_paths: Dict[int, str], timeline: List[Dict[str, Any]], work_dir: str) -> Dict[str, Any]:
+        """Assemble the film in work_dir and move it to the media store
+        
+        video_paths maps scene numbers to local video files. Returns the film's
+        media reference and assembly statistics.
+        """
+        try:
+            start = time.monotonic()
+            os.makedirs(work_dir, exist_ok=True)
+            output_path = os.path.join(work_dir, 'film.mp4')
+            
+            segments = [(entry, video_paths.get(entry['scene_number'])) for entry in timeline]
+            probes = await asyncio.gather(*(self._probe(path) for _, path in segments if path))
+            if not probes:
+                raise RuntimeError("No scene videos to assemble")
+            video_format = probes[0]
+            
+            stream_copy = len(probes) == len(segments) and video_format['codec_name'] in MP4_COPY_CODECS and all(
+                all(probe.get(field) == video_format.get(field) for field in COPY_COMPATIBLE_FIELDS) for probe in probes
+            )
+            
+            total_duration = timeline[-1]['end_time']
+            if stream_copy:
+                args = self._stream_copy_args(segments, probes, timeline, work_dir, total_duration)
+            else:
+                args = self._reencode_args(segments, video_format, timeline, work_dir, total_duration)
+            
+            async with self._slots:
+                await self._run([self.ffmpeg, '-y', '-hide_banner', '-loglevel', 'error', *args, output_path])
+            
+            file_size = os.path.getsize(output_path)
+            film_ref = await asyncio.to_thread(self._store, output_path)
+            assembly_time = time.monotonic() - start
+            
+            self.films_assembled += 1
+            self.stream_copies += int(stream_copy)
+            self.output_seconds += total_duration
+            self.assembly_seconds += assembly_time
+            
+            seconds_per_minute = assembly_time * 60 / total_duration if total_duration else 0.0
+            logger.info(f"Assembled {total_duration:.1f}s film from {len(segments)} scenes in {assembly_time:.2f}s "
+                        f"({'stream copy' if stream_copy else 're-encode'}, {seconds_per_minute:.2f}s per output minute)")
+            
+            return {
+                'film_ref': film_ref,
+                'mode': 'stream_copy' if stream_copy else 'reencode',
+                'resolution': f"{video_format['width']}x{video_format['height']}",
+                'duration': total_duration,
+                'file_size': file_size,
+                'assembly_time': assembly_time,
+                'assembly_seconds_per_output_minute': seconds_per_minute
+            }
+        
+        except Exception as e:
+            logger.error(f"Error assembling film: {str(e)}")
+            raise
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get assembly counters"""
+        return {
+            'films_assembled': self.films_assembled,
+            'stream_copies': self.stream_copies,
+            'output_minutes': self.output_seconds / 60,
+            'assembly_seconds_per_output_minute': self.assembly_seconds * 60 / self.output_seconds if self.output_seconds else 0.0
+        }
+    
+    def _stream_copy_args(self, segments: List[Tuple[Dict[str, Any], str]], probes: List[Dict[str, Any]],
+                          timeline: List[Dict[str, Any]], work_dir: str, total_duration: float) -> List[str]:
+        """Concat demuxer input; each scene video is repeated to fill its timeline slot"""
+        lines = []
+        for (entry, path), probe in zip(segments, probes):
+            video_duration = float(probe.get('duration') or 0) or entry['duration']
+            repeats = max(1, math.ceil(entry['duration'] / video_duration - 1e-6))
+            quoted = path.replace("'", "'\\''")
+            for _ in range(repeats):
+                lines.append(f"file '{quoted}'")
+            remainder = entry['duration'] - (repeats - 1) * video_duration
+            if remainder < video_duration:
+                lines.append(f"outpoint {remainder:.3f}")
+        
+        concat_list = os.path.join(work_dir, 'scenes.txt')
+        with open(concat_list, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        
+        args = ['-f', 'concat', '-safe', '0', '-i', concat_list]
+        audio_args, audio_filters = self._audio_inputs(timeline, first_input=1)
+        args += audio_args
+        if audio_filters:
+            args += ['-filter_complex_script', self._write_filter(work_dir, audio_filters), '-map', '0:v', '-map', '[aout]']
+        else:
+            args += ['-map', '0:v', '-an']
+        return args + ['-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k', '-t', f"{total_duration:.3f}", '-movflags', '+faststart']
+    
+    def _reencode_args(self, segments: List[Tuple[Dict[str, Any], Optional[str]]], video_format: Dict[str, Any],
+                       timeline: List[Dict[str, Any]], work_dir: str, total_duration: float) -> List[str]:
+        """One looped input per scene (black for scenes without video), scaled and concatenated"""
+        width, height = video_format['width'], video_format['height']
+        fps = video_format.get('r_frame_rate') or '24/1'
+        
+        args = []
+        filters = []
+        for index, (entry, path) in enumerate(segments):
+            duration = f"{entry['duration']:.3f}"
+            if path:
+                args += ['-stream_loop', '-1', '-t', duration, '-i', path]
+            else:
+                args += ['-f', 'lavfi', '-t', duration, '-i', f"color=c=black:s={width}x{height}:r={fps}"]
+            filters.append(
+                f"[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p[v{index}]"
+            )
+        filters.append(f"{''.join(f'[v{i}]' for i in range(len(segments)))}concat=n={len(segments)}:v=1:a=0[vout]")
+        
+        audio_args, audio_filters = self._audio_inputs(timeline, first_input=len(segments))
+        args += audio_args + ['-filter_complex_script', self._write_filter(work_dir, filters + audio_filters), '-map', '[vout]']
+        args += ['-map', '[aout]'] if audio_filters else ['-an']
+        return args + ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-c:a', 'aac', '-b:a', '192k',
+                       '-t', f"{total_duration:.3f}", '-movflags', '+faststart']
+    
+    def _audio_inputs(self, timeline: List[Dict[str, Any]], first_input: int) -> Tuple[List[str], List[str]]:
+        """Inputs and filters placing every stored dialog clip at its timeline position as [aout]"""
+        args = []
+        filters = []
+        for entry in timeline:
+            for clip in entry.get('audio_clips', []):
+                if not clip.get('audio_ref') or not self.media_store.exists(clip['audio_ref']):
+                    continue
+                index = first_input + len(filters)
+                args += ['-i', self.media_store.path_for(clip['audio_ref'])]
+                filters.append(f"[{index}:a]adelay={int(clip['start_time'] * 1000)}:all=1[a{len(filters)}]")
+        
+        if filters:
+            labels = ''.join(f'[a{i}]' for i in range(len(filters)))
+            filters.append(f"{labels}amix=inputs={len(filters)}:normalize=0:duration=longest,apad[aout]")
+        return args, filters
+    
+    def _write_filter(self, work_dir: str, filters: List[str]) -> str:
+        # Filter graphs of long films exceed command line limits, so pass them as a file
+        path = os.path.join(work_dir, 'filters.txt')
+        with open(path, 'w') as f:
+            f.write(';\n'.join(filters))
+        return path
+    
+    async def _probe(self, path: str) -> Dict[str, Any]:
+        """Read the first video stream's properties with ffprobe"""
+        output = await self._run([
+            self.ffprobe, '-v', 'error', '-select_streams', 'v:0', '-print_format', 'json',
+            '-show_entries', f"stream={','.join(COPY_COMPATIBLE_FIELDS)},duration", path
+        ])
+        streams = json.loads(output).get('streams', [])
+        if not streams:
+            raise RuntimeError(f"No video stream in {path}")
+        return streams[0]
+    
+    async def _run(self, args: List[str]) -> bytes:
+        process = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            raise RuntimeError(f"{os.path.basename(args[0])} failed ({process.returncode}): {stderr.decode(errors='replace')[-500:]}")
+        return stdout
+    
+    def _store(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            return self.media_store.put_stream(iter(lambda: f.read(1024 * 1024), b''), 'mp4')
@@ -0,0 +1,145 @@
+import logging
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+from modules.character_ai import CharacterIndex
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class FilmPipeline:
+    """Streams scenes through analysis, voice and render stages
+    
+    Each stage runs as its own task and hands scenes to the next one through
+    a bounded queue, so rendering and voicing of early scenes overlaps with
+    parsing and analysis of later ones. Results keep the scene order.
+    
+    Each voice worker synthesizes one scene at a time, with all of its lines
+    going through the TTS request limit. voice_workers defaults to that
+    limit, so scenes with only a line or two still keep every TTS slot busy.
+    """
+    
+    def __init__(self, scene_analyzer, voice_ai, render_engine, queue_size: int = 4, voice_workers: Optional[int] = None):
+        self.scene_analyzer = scene_analyzer
+        self.voice_ai = voice_ai
+        self.render_engine = render_engine
+        self.queue_size = max(1, queue_size)
+        self.voice_workers = max(1, voice_workers or voice_ai.max_concurrent_requests)
+    
+    async def run(self, scenes: Iterable[Dict[str, Any]], style: str = 'cinematic', quality: str = 'medium',
+                  cast_scenes: Optional[List[Dict[str, Any]]] = None, analyzed: bool = False,
+                  on_scene_rendered: Optional[Callable[[Dict[str, Any], int, Optional[int]], Union[None, Awaitable[None]]]] = None
+                  ) -> Dict[str, Any]:
+        """Process scenes as they arrive from the (possibly lazy) scenes iterable
+        
+        cast_scenes seeds voice casting with the full film when only some
+        scenes are processed. analyzed skips scene analysis for scenes that
+        were already analyzed (e.g. by batch analysis). on_scene_rendered is called with the scene, the
+        number of scenes rendered so far and the total (None while scenes are
+        still arriving). Returns the processed scenes and pipeline metrics.
+        """
+        start = time.monotonic()
+        analyze_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        voice_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        render_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        render_workers = self.render_engine.max_job_concurrency
+        
+        results: List[Dict[str, Any]] = []
+        state = {'rendered': 0, 'first_video_at': None}
+        
+        # Voices are cast per job as characters appear; characters keep the voices of reused audio
+        characters = CharacterIndex(cast_scenes)
+        voice_mapping = {
+            clip['character']: clip['voice']
+            for scene in cast_scenes or [] for clip in scene.get('audio_clips', [])
+        }
+        voice_mapping.update(self.voice_ai.assign_voices(
+            [name for name in characters.characters if name not in voice_mapping], taken=voice_mapping.values()
+        ))
+        
+        async def feed():
+            for scene in scenes:
+                results.append(scene)
+                await analyze_queue.put(scene)
+                # Parsing is CPU work; let the other stages run between scenes
+                await asyncio.sleep(0)
+            await analyze_queue.put(_DONE)
+        
+        async def analyze():
+            while (scene := await analyze_queue.get()) is not _DONE:
+                if not analyzed:
+                    self.scene_analyzer.analyze(scene, style)
+                
+                # Scenes from cast_scenes are indexed again here; their characters already have voices
+                new_characters = [name for name in characters.update([scene]) if name not in voice_mapping]
+                if new_characters:
+                    voice_mapping.update(self.voice_ai.assign_voices(new_characters, taken=voice_mapping.values()))
+                
+                await voice_queue.put(scene)
+            for _ in range(self.voice_workers):
+                await voice_queue.put(_DONE)
+        
+        async def voice():
+            while (scene := await voice_queue.get()) is not _DONE:
+                audio_clips = await self.voice_ai.generate_scene_audio(scene, voice_mapping)
+                scene['audio_clips'] = [{
+                    'character': clip['character'],
+                    'text': clip['text'],
+                    'voice': clip['voice'],
+                    'audio_ref': clip.get('audio_ref'),
+                    'duration': clip.get('duration')
+                } for clip in audio_clips]
+                await render_queue.put(scene)
+        
+        async def render():
+            while (scene := await render_queue.get()) is not _DONE:
+                await self.render_engine.render_scene(scene, style, quality)
+                state['rendered'] += 1
+                if state['first_video_at'] is None and scene.get('render_status') == 'completed':
+                    state['first_video_at'] = time.monotonic()
+                if on_scene_rendered:
+                    result = on_scene_rendered(scene, state['rendered'], len(results))
+                    if inspect.isawaitable(result):
+                        await result
+        
+        async def close_render_queue(voice_tasks):
+            await asyncio.gather(*voice_tasks)
+            for _ in range(render_workers):
+                await render_queue.put(_DONE)
+        
+        voice_tasks = [asyncio.create_task(voice()) for _ in range(self.voice_workers)]
+        tasks = [
+            asyncio.create_task(feed()),
+            asyncio.create_task(analyze()),
+            *voice_tasks,
+            asyncio.create_task(close_render_queue(voice_tasks)),
+            *(asyncio.create_task(render()) for _ in range(render_workers))
+        ]
+        
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One stage failed (or the job was cancelled): stop all the others
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        duration = time.monotonic() - start
+        metrics = {
+            'scenes': len(results),
+            'pipeline_duration': duration,
+            'time_to_first_scene_video': state['first_video_at'] - start if state['first_video_at'] else None
+        }
+        logger.info(f"Pipeline processed {len(results)} scenes in {duration:.2f}s "
+                    f"(first scene video after {metrics['time_to_first_scene_video'] or 0:.2f}s)")
+        
+        return {
+            'scenes': results,
+            'characters': list(characters.characters.values()),
+            'voice_mapping': voice_mapping,
+            'metrics': metrics
+        }
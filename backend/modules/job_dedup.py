@@ -0,0 +1,95 @@
+import logging
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class JobDeduplicator:
+    """Finds the job an identical film request already started
+    
+    Requests are identified by a fingerprint of screenplay, style and
+    quality. A request repeated within window_seconds (double clicks, client
+    retries) gets the existing job, queued, in progress or completed, instead
+    of a new one; failed jobs are never reused, and neither are processing
+    jobs without progress or heartbeat for stale_seconds, whose runner may
+    have died. Lookup and job creation for one fingerprint run under a lock,
+    so concurrent duplicates in this process resolve to a single job.
+    """
+    
+    def __init__(self, collection, window_seconds: int = 600, stale_seconds: int = 300):
+        self.collection = collection
+        self.window_seconds = window_seconds
+        self.stale_seconds = stale_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+        
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_fingerprint(screenplay: str, style: str, quality: str) -> str:
+        """Build the fingerprint of a film request"""
+        payload = json.dumps([screenplay, style, quality], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def ensure_indexes(self):
+        """Create the index used for fingerprint lookups"""
+        await self.collection.create_index([('fingerprint', 1), ('created_at', -1)])
+    
+    @asynccontextmanager
+    async def single_flight(self, fingerprint: str) -> AsyncIterator[None]:
+        """Hold the lock for a fingerprint while looking up and creating its job"""
+        lock = self._locks.setdefault(fingerprint, asyncio.Lock())
+        self._waiters[fingerprint] = self._waiters.get(fingerprint, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[fingerprint] -= 1
+            if not self._waiters[fingerprint]:
+                del self._waiters[fingerprint]
+                del self._locks[fingerprint]
+    
+    async def find_job(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Most recent live job for the fingerprint created within the window"""
+        if not self.window_seconds:
+            return None
+        
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.window_seconds)
+        active_since = now - timedelta(seconds=self.stale_seconds)
+        job = await self.collection.find_one(
+            {
+                'fingerprint': fingerprint,
+                'created_at': {'$gte': cutoff.isoformat()},
+                '$or': [
+                    {'status': {'$in': ['queued', 'completed']}},
+                    # Progress writes refresh updated_at; queue workers also heartbeat while rendering
+                    {'status': 'processing', 'updated_at': {'$gte': active_since.isoformat()}},
+                    {'status': 'processing', 'heartbeat_at': {'$gte': active_since}}
+                ]
+            },
+            {'_id': 0, 'id': 1, 'status': 1},
+            sort=[('created_at', -1)]
+        )
+        
+        if job:
+            self.hits += 1
+            logger.info(f"Duplicate film request attached to job {job['id']} ({job['status']})")
+        else:
+            self.misses += 1
+        return job
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get deduplication counters"""
+        return {
+            'window_seconds': self.window_seconds,
+            'stale_seconds': self.stale_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_flight': len(self._locks)
+        }
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+class JobQueue:
+    """Durable job queue on top of the film_jobs collection
+    
+    Queued jobs are claimed by worker processes with a lease that the worker
+    extends through heartbeats. When a worker dies its lease runs out and the
+    job is claimed again by another worker, until max_attempts is reached and
+    the job is failed.
+    """
+    
+    def __init__(self, collection, lease_seconds: int = 60, max_attempts: int = 3):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+    
+    async def ensure_indexes(self):
+        """Create the indexes used for claiming jobs"""
+        await self.collection.create_index([('status', 1), ('queued_at', 1)])
+        await self.collection.create_index([('status', 1), ('lease_expires_at', 1)])
+    
+    def queue_fields(self) -> Dict[str, Any]:
+        """Fields that put a new job document into the queue"""
+        return {
+            'status': 'queued',
+            'queued_at': datetime.now(timezone.utc),
+            'attempts': 0
+        }
+    
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Claim the oldest queued job or a job whose lease has expired"""
+        now = datetime.now(timezone.utc)
+        job = await self.collection.find_one_and_update(
+            {
+                '$or': [
+                    {'status': 'queued'},
+                    {'status': 'processing', 'lease_expires_at': {'$lt': now}}
+                ],
+                'attempts': {'$lt': self.max_attempts}
+            },
+            {
+                '$set': {
+                    'status': 'processing',
+                    'lease_owner': worker_id,
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                    'heartbeat_at': now,
+                    'updated_at': now.isoformat()
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('queued_at', 1)],
+            projection={'_id': 0, 'scenes': 0, 'timeline': 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if job:
+            logger.info(f"Worker {worker_id} claimed job {job['id']} (attempt {job['attempts']})")
+        return job
+    
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; returns False if the worker no longer owns the job"""
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_one(
+            {'id': job_id, 'lease_owner': worker_id, 'status': 'processing'},
+            {
+                '$set': {
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                    'heartbeat_at': now
+                }
+            }
+        )
+        return result.matched_count > 0
+    
+    async def release(self, job_id: str, worker_id: str):
+        """Drop the lease after the job finished"""
+        await self.collection.update_one(
+            {'id': job_id, 'lease_owner': worker_id},
+            {'$unset': {'lease_owner': '', 'lease_expires_at': ''}}
+        )
+    
+    async def requeue(self, job_id: str, worker_id: str):
+        """Hand a job back to the queue, e.g. when a worker shuts down"""
+        await self.collection.update_one(
+            {'id': job_id, 'lease_owner': worker_id, 'status': 'processing'},
+            {
+                '$set': {'status': 'queued', 'updated_at': datetime.now(timezone.utc).isoformat()},
+                '$unset': {'lease_owner': '', 'lease_expires_at': ''},
+                '$inc': {'attempts': -1}
+            }
+        )
+        logger.info(f"Worker {worker_id} requeued job {job_id}")
+    
+    async def fail_exhausted(self) -> int:
+        """Fail jobs whose lease expired after their last allowed attempt"""
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_many(
+            {
+                'status': 'processing',
+                'lease_expires_at': {'$lt': now},
+                'attempts': {'$gte': self.max_attempts}
+            },
+            {
+                '$set': {
+                    'status': 'failed',
+                    'error': f"Job abandoned after {self.max_attempts} attempts",
+                    'updated_at': now.isoformat()
+                },
+                '$unset': {'lease_owner': '', 'lease_expires_at': ''}
+            }
+        )
+        if result.modified_count:
+            logger.warning(f"Failed {result.modified_count} jobs with exhausted attempts")
+        return result.modified_count
@@ -0,0 +1,78 @@
+import re
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class KeywordRules:
+    """Declarative keyword rules compiled into a single matcher
+
+    Rules are (category, value, keywords) tuples in priority order. match()
+    selects, per category, the value of the first rule with a keyword that
+    occurs anywhere in the text (plain substring semantics, like
+    `keyword in text`). All keywords are compiled into one trie-shaped regex
+    that is scanned once per text, so the cost per text depends on the text
+    length and the number of hits, not on the number of rules.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str, Iterable[str]]]):
+        # keyword -> [(priority, category, value)] for every rule using it
+        self._rules_by_keyword: Dict[str, List[Tuple[int, str, str]]] = {}
+        for priority, (category, value, keywords) in enumerate(rules):
+            for keyword in keywords:
+                self._rules_by_keyword.setdefault(keyword.lower(), []).append((priority, category, value))
+
+        keywords = sorted(self._rules_by_keyword)
+        # The regex reports the longest keyword starting at each position;
+        # shorter keywords that are prefixes of it occur there as well
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        # A zero-width lookahead reports a match at every position, so keywords
+        # overlapping or nested in other keywords are found too
+        self._pattern = re.compile(f"(?=({self._trie_pattern(keywords)}))") if keywords else None
+
+        logger.info(f"Compiled {len(keywords)} keywords into rule matcher")
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Get all keywords that occur in the (lowercased) text"""
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._prefixes[keyword])
+        return found
+
+    def match(self, text: str) -> Dict[str, str]:
+        """Select the highest priority matching rule value for each category"""
+        best: Dict[str, Tuple[int, str]] = {}
+        for keyword in self.find_keywords(text):
+            for priority, category, value in self._rules_by_keyword[keyword]:
+                if category not in best or priority < best[category][0]:
+                    best[category] = (priority, value)
+        return {category: value for category, (_, value) in best.items()}
+
+    @staticmethod
+    def _trie_pattern(words: List[str]) -> str:
+        """Build a regex matching the longest of the words as a trie of alternations"""
+        trie: Dict = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+            if not branches:
+                return ''
+            pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            # A word ends here: the longer continuations are optional (and tried first)
+            return f"(?:{pattern})?" if '' in node else pattern
+
+        return build(trie)
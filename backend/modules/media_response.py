@@ -0,0 +1,89 @@
+import logging
+import asyncio
+import mimetypes
+import os
+from typing import AsyncIterator, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Read size for partial responses
+RANGE_CHUNK_SIZE = 256 * 1024
+# Content-addressed files never change, so clients may cache them indefinitely
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """First and last byte of a single 'bytes=' range, or None to send the whole file
+    
+    Multiple and malformed ranges are answered with the whole file, as HTTP
+    allows. Raises ValueError if the range lies outside the file.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        first_byte = int(first) if first else None
+        last_byte = int(last) if last else None
+    except ValueError:
+        return None  # Malformed ranges are ignored
+    
+    if first_byte is None:
+        # Suffix range: the last N bytes
+        if not last_byte:
+            raise ValueError(f"Unsatisfiable range: {header}")
+        start, end = max(0, size - last_byte), size - 1
+    else:
+        start = first_byte
+        end = size - 1 if last_byte is None else min(last_byte, size - 1)
+    if start >= size or end < start:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, end
+
+def media_file_response(request: Request, path: str, etag: str, media_type: Optional[str] = None) -> Response:
+    """Serve an immutable file with ETag revalidation and single byte-range requests
+    
+    Whole files go through FileResponse, which hands the file to the server
+    (sendfile where supported); ranges are streamed in RANGE_CHUNK_SIZE reads,
+    so the process never buffers more than one chunk.
+    """
+    size = os.path.getsize(path)
+    media_type = media_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    quoted_etag = f'"{etag}"'
+    headers = {'ETag': quoted_etag, 'Accept-Ranges': 'bytes', 'Cache-Control': IMMUTABLE_CACHE_CONTROL}
+    
+    if quoted_etag in [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]:
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = None
+    range_header = request.headers.get('range')
+    # If-Range: only honour the range if the client's copy is still current
+    if range_header and request.headers.get('if-range', quoted_etag) == quoted_etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, 'Content-Range': f"bytes */{size}"})
+    
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+    headers['Content-Length'] = str(end - start + 1)
+    return StreamingResponse(_read_range(path, start, end), status_code=206, media_type=media_type, headers=headers)
+
+async def _read_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        position = start
+        while position <= end:
+            chunk = await asyncio.to_thread(os.pread, fd, min(RANGE_CHUNK_SIZE, end - position + 1), position)
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+    finally:
+        os.close(fd)
@@ -0,0 +1,168 @@
+import logging
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Set
+
+logger = logging.getLogger(__name__)
+
+# sha256 hex digest plus file extension
+REF_PATTERN = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+class MediaStore:
+    """Content-addressed store for generated media on local disk
+    
+    Objects are referenced by the sha256 of their content plus the file
+    extension (e.g. '3fa4...c2.mp3'), so identical clips are stored once and
+    a reference never changes meaning. Writes stream to a temporary file and
+    are renamed into place, so readers never see partial objects.
+    """
+    
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.objects_written = 0
+        self.bytes_written = 0
+        self.dedup_hits = 0
+        self.objects_collected = 0
+        self.bytes_collected = 0
+    
+    def put(self, data: bytes, extension: str) -> str:
+        """Store bytes, returning their reference"""
+        return self.put_stream([data], extension)
+    
+    def put_stream(self, chunks: Iterable[bytes], extension: str) -> str:
+        """Store content arriving in chunks without holding it in memory"""
+        writer = self.writer(extension)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+            return writer.commit()
+        except BaseException:
+            writer.discard()
+            raise
+    
+    def writer(self, extension: str) -> 'MediaWriter':
+        """Start an object whose chunks are written one call at a time"""
+        return MediaWriter(self, extension)
+    
+    def open(self, ref: str) -> BinaryIO:
+        """Open a stored object for reading"""
+        return open(self.path_for(ref), 'rb')
+    
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self.path_for(ref))
+    
+    def size(self, ref: str) -> int:
+        return os.path.getsize(self.path_for(ref))
+    
+    def delete(self, ref: str) -> bool:
+        """Remove an object; returns False if it did not exist"""
+        try:
+            os.remove(self.path_for(ref))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def refs(self) -> Iterator[str]:
+        """Iterate over the references of all stored objects"""
+        for shard in os.scandir(self.root_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if REF_PATTERN.match(entry.name):
+                        yield entry.name
+    
+    def collect(self, keep: Set[str], extension: str, min_age_seconds: float) -> Dict[str, int]:
+        """Delete objects with the given extension that are not in keep
+        
+        Objects modified within min_age_seconds are left alone, so clips of
+        jobs still running (not yet saved anywhere) survive.
+        """
+        cutoff = time.time() - min_age_seconds
+        suffix = f".{extension}"
+        deleted = 0
+        bytes_freed = 0
+        for ref in list(self.refs()):
+            if not ref.endswith(suffix) or ref in keep:
+                continue
+            path = self.path_for(ref)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+            bytes_freed += stat.st_size
+        
+        with self._lock:
+            self.objects_collected += deleted
+            self.bytes_collected += bytes_freed
+        return {'deleted': deleted, 'bytes_freed': bytes_freed}
+    
+    def path_for(self, ref: str) -> str:
+        if not REF_PATTERN.match(ref):
+            raise ValueError(f"Invalid media reference: {ref}")
+        return os.path.join(self.root_dir, ref[:2], ref)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write, deduplication and garbage collection counters"""
+        with self._lock:
+            return {
+                'objects_written': self.objects_written,
+                'bytes_written': self.bytes_written,
+                'dedup_hits': self.dedup_hits,
+                'objects_collected': self.objects_collected,
+                'bytes_collected': self.bytes_collected
+            }
+
+class MediaWriter:
+    """Writes one object into a MediaStore chunk by chunk
+    
+    Chunks go to a temporary file in the store; commit() files it under its
+    reference and discard() removes it.
+    """
+    
+    def __init__(self, store: MediaStore, extension: str):
+        self.store = store
+        self.extension = extension.lstrip('.').lower()
+        self.size = 0
+        self._digest = hashlib.sha256()
+        fd, self._temp_path = tempfile.mkstemp(dir=store.root_dir, suffix='.tmp')
+        self._file = os.fdopen(fd, 'wb')
+    
+    def write(self, chunk: bytes):
+        self._digest.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+    
+    def commit(self) -> str:
+        """Move the written content into place, returning its reference"""
+        self._file.close()
+        ref = f"{self._digest.hexdigest()}.{self.extension}"
+        path = self.store.path_for(ref)
+        if os.path.exists(path):
+            os.remove(self._temp_path)
+            os.utime(path)  # Written again just now: restart its garbage collection grace period
+            with self.store._lock:
+                self.store.dedup_hits += 1
+            return ref
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self._temp_path, path)
+        with self.store._lock:
+            self.store.objects_written += 1
+            self.store.bytes_written += self.size
+        return ref
+    
+    def discard(self):
+        """Drop the partial content"""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
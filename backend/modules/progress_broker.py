@@ -0,0 +1,100 @@
+import logging
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+class ProgressBroker:
+    """In-process fan-out of job progress events to streaming clients
+    
+    The pipeline publishes events as they happen; every subscribed client gets
+    its own bounded queue. For jobs running in another process (worker mode)
+    a single poller per watched job reads the job status and publishes
+    changes, so the database load does not grow with the number of clients.
+    """
+    
+    def __init__(self, fetch_status: Optional[Callable[[str], Awaitable[Optional[Dict[str, Any]]]]] = None,
+                 poll_interval: float = 1.0, queue_size: int = 100):
+        self.fetch_status = fetch_status
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+    
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        """Send an event to all subscribers of a job"""
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                # Slow client: drop its oldest event rather than blocking the pipeline
+                queue.get_nowait()
+            queue.put_nowait(event)
+    
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Register a subscriber; events are delivered to the returned queue"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        
+        if self.fetch_status and job_id not in self._pollers:
+            self._pollers[job_id] = asyncio.create_task(self._poll(job_id))
+        return queue
+    
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        """Remove a subscriber, stopping the job's poller when none are left"""
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+            poller = self._pollers.pop(job_id, None)
+            if poller:
+                poller.cancel()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get subscriber counts"""
+        return {
+            'watched_jobs': len(self._subscribers),
+            'subscribers': sum(len(s) for s in self._subscribers.values()),
+            'pollers': len(self._pollers)
+        }
+    
+    @staticmethod
+    def format_sse(event: Dict[str, Any]) -> str:
+        """Format an event as a server-sent event message"""
+        return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+    
+    @staticmethod
+    def is_terminal(event: Dict[str, Any]) -> bool:
+        return event.get('type') == 'status' and event.get('status') in TERMINAL_STATUSES
+    
+    async def _poll(self, job_id: str):
+        """Publish status changes of a job processed elsewhere"""
+        last_progress = None
+        last_status = None
+        try:
+            while job_id in self._subscribers:
+                try:
+                    job = await self.fetch_status(job_id)
+                except Exception as e:
+                    logger.warning(f"Error polling job {job_id}: {str(e)}")
+                    job = None
+                
+                if job:
+                    if job.get('progress') != last_progress:
+                        last_progress = job.get('progress')
+                        self.publish(job_id, {'type': 'progress', 'job_id': job_id, 'progress': last_progress,
+                                              'status': job.get('status')})
+                    if job.get('status') != last_status:
+                        last_status = job.get('status')
+                        self.publish(job_id, {'type': 'status', 'job_id': job_id, 'status': last_status,
+                                              'error': job.get('error')})
+                
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._pollers.get(job_id) is asyncio.current_task():
+                del self._pollers[job_id]
@@ -0,0 +1,96 @@
+import logging
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+class ProgressWriter:
+    """Coalesces job progress updates into rate-limited database writes
+    
+    Updates for a job are merged into one pending $set, so newer values replace
+    older ones that were never written. A job is written at most once per
+    min_interval; final updates (completed/failed) are written immediately,
+    together with anything still pending, and always land last. A final
+    update can also remove fields that are no longer needed.
+    """
+    
+    def __init__(self, collection, min_interval: float = 1.0):
+        self.collection = collection
+        self.min_interval = min_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_write: Dict[str, float] = {}
+        self._scheduled: Dict[str, asyncio.Task] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        
+        self.updates_requested = 0
+        self.writes_issued = 0
+    
+    async def update(self, job_id: str, fields: Dict[str, Any], final: bool = False, unset: Iterable[str] = ()):
+        """Queue fields for the job document, writing now if allowed
+        
+        unset names fields to remove with a final update.
+        """
+        self._pending.setdefault(job_id, {}).update(fields)
+        self.updates_requested += 1
+        
+        if final:
+            await self._write(job_id, unset)
+            self._forget(job_id)
+            return
+        
+        if job_id in self._scheduled:
+            return  # A write is already due and will include these fields
+        
+        wait = self._last_write.get(job_id, 0.0) + self.min_interval - time.monotonic()
+        if wait <= 0:
+            await self._write(job_id)
+        else:
+            self._scheduled[job_id] = asyncio.create_task(self._write_later(job_id, wait))
+    
+    async def flush_all(self):
+        """Write everything that is still pending, e.g. on shutdown"""
+        for job_id in list(self._pending):
+            await self._write(job_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write amplification counters"""
+        return {
+            'updates_requested': self.updates_requested,
+            'writes_issued': self.writes_issued,
+            'pending_jobs': len(self._pending)
+        }
+    
+    async def _write_later(self, job_id: str, delay: float):
+        try:
+            await asyncio.sleep(delay)
+            self._scheduled.pop(job_id, None)
+            await self._write(job_id)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error writing progress for job {job_id}: {str(e)}")
+    
+    async def _write(self, job_id: str, unset: Iterable[str] = ()):
+        # Serialize writes per job so a final update can never be overtaken
+        lock = self._locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            fields = self._pending.pop(job_id, None)
+            if not fields:
+                return
+            
+            fields['updated_at'] = datetime.now(timezone.utc).isoformat()
+            update = {"$set": fields}
+            if unset:
+                update["$unset"] = {field: "" for field in unset}
+            self._last_write[job_id] = time.monotonic()
+            self.writes_issued += 1
+            await self.collection.update_one({"id": job_id}, update)
+    
+    def _forget(self, job_id: str):
+        task = self._scheduled.pop(job_id, None)
+        if task:
+            task.cancel()
+        self._last_write.pop(job_id, None)
+        self._locks.pop(job_id, None)
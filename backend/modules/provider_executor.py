@@ -0,0 +1,86 @@
+import logging
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class ProviderExecutor:
+    """Runs blocking provider SDK calls (Replicate, OpenAI TTS) off the event loop
+    
+    Each provider gets its own thread pool so a slow render backend cannot
+    starve TTS calls and vice versa. Queue depth and timing counters are kept
+    for the metrics endpoint.
+    """
+    
+    def __init__(self, name: str, max_workers: int = 4):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{name}-provider")
+        self._lock = threading.Lock()
+        
+        self._queued = 0
+        self._active = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._failed = 0
+        self._queue_wait_total = 0.0
+        self._run_time_total = 0.0
+        
+        logger.info(f"Provider executor '{name}' started with {self.max_workers} workers")
+    
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        
+        def call():
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._queue_wait_total += started_at - submitted_at
+            
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self._failed += 1
+                raise
+            else:
+                with self._lock:
+                    self._completed += 1
+                return result
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._run_time_total += time.monotonic() - started_at
+        
+        return await loop.run_in_executor(self._executor, call)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and timing metrics"""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'queued': self._queued,
+                'active': self._active,
+                'max_queued': self._max_queued,
+                'completed': self._completed,
+                'failed': self._failed,
+                'avg_queue_wait': self._queue_wait_total / finished if finished else 0.0,
+                'avg_run_time': self._run_time_total / finished if finished else 0.0
+            }
+    
+    def shutdown(self, wait: bool = False):
+        """Shut down the thread pool"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info(f"Provider executor '{self.name}' shut down")
@@ -0,0 +1,109 @@
+import logging
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class RenderCache:
+    """Caches rendered scene videos by prompt, style, quality and model version
+    
+    Results are kept in a small in-memory LRU and persisted in a MongoDB
+    collection so they are shared between jobs and survive restarts. Entries
+    expire after ttl_seconds because provider delivery URLs are not permanent.
+    """
+    
+    def __init__(self, collection=None, ttl_seconds: int = 3600, max_memory_entries: int = 1024):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+    
+    @staticmethod
+    def make_key(prompt: str, style: str, quality: str, model_version: str) -> str:
+        """Build the cache key for a scene render"""
+        payload = json.dumps([prompt, style, quality, model_version], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def ensure_indexes(self):
+        """Create the lookup index and the TTL index used for expiry"""
+        if self.collection is None:
+            return
+        await self.collection.create_index('key', unique=True)
+        if self.ttl_seconds:
+            await self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached render result, or None on a miss"""
+        entry = self._memory.get(key)
+        if entry is not None and not self._is_expired(entry):
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry['result']
+        self._memory.pop(key, None)
+        
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({'key': key}, {'_id': 0, 'result': 1, 'cached_at': 1})
+            except Exception as e:
+                logger.warning(f"Render cache lookup failed: {str(e)}")
+                doc = None
+            
+            if doc and not self._is_expired(doc):
+                self._remember(key, doc)
+                self.hits += 1
+                return doc['result']
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, key: str, result: Dict[str, Any]):
+        """Store a render result"""
+        entry = {
+            'result': {
+                'video_url': result['video_url'],
+                'file_size': result['file_size'],
+                'quality': result.get('quality'),
+                'is_demo': result.get('is_demo', False)
+            },
+            'cached_at': time.time()
+        }
+        self._remember(key, entry)
+        self.stores += 1
+        
+        if self.collection is not None:
+            try:
+                await self.collection.update_one(
+                    {'key': key},
+                    {'$set': {**entry, 'key': key, 'created_at': datetime.now(timezone.utc)}},
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Render cache store failed: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+    
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        return bool(self.ttl_seconds) and time.time() - entry['cached_at'] > self.ttl_seconds
+    
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
@@ -2,20 +2,43 @@ import logging
 import os
 import replicate
 import asyncio
-from typing import Dict, Any, List
-import requests
+from typing import Dict, Any, Optional
 import random
 import time
+from modules.provider_executor import ProviderExecutor
+from modules.render_cache import RenderCache
 
 logger = logging.getLogger(__name__)
 
+IMAGE_MODEL = "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b"
+VIDEO_MODEL = "stability-ai/stable-video-diffusion:3f0457e4619daac51203dedb472816fd4af51f3149fa7a9e0b5ffcf1b8172438"
+
+# Render resolution (width, height) per quality setting
+QUALITY_RESOLUTIONS = {
+    'low': (768, 432),
+    'medium': (1024, 576),
+    'high': (1280, 720),
+    'ultra': (1920, 1080)
+}
+
 class RenderEngine:
     """Renders scenes using Replicate API for video generation"""
     
-    def __init__(self, replicate_token: str, demo_mode: bool = False):
+    def __init__(self, replicate_token: str, demo_mode: bool = False, max_concurrent_renders: int = 4,
+                 max_job_concurrency: int = 4, executor: Optional[ProviderExecutor] = None,
+                 render_cache: Optional[RenderCache] = None):
         self.replicate_token = replicate_token
         os.environ['REPLICATE_API_TOKEN'] = replicate_token
         self.demo_mode = demo_mode
+        self.render_cache = render_cache
+        
+        # replicate.run is blocking, so it always runs on a dedicated executor
+        self.executor = executor or ProviderExecutor('replicate', max_workers=max_concurrent_renders)
+        
+        # Concurrency limits: global across all jobs, and default per job
+        self.max_concurrent_renders = max(1, max_concurrent_renders)
+        self.max_job_concurrency = max(1, max_job_concurrency)
+        self._render_slots = asyncio.Semaphore(self.max_concurrent_renders)
         
         # Demo video URLs for testing
         self.demo_videos = [
@@ -24,37 +47,43 @@ class RenderEngine:
             "https://replicate.delivery/pbxt/demo3.mp4"
         ]
     
+    def build_prompt(self, scene: Dict[str, Any], style: str = 'cinematic') -> str:
+        """Build the final generation prompt for a scene"""
+        # Get the visual description
+        prompt = scene.get('visual_description', '')
+        
+        if not prompt:
+            prompt = f"{scene['type']} scene in {scene['location']}"
+        
+        # Add style modifiers
+        if style == 'realistic':
+            prompt += ", photorealistic, highly detailed"
+        elif style == 'animated':
+            prompt += ", animated style, cartoon, colorful"
+        elif style == 'noir':
+            prompt += ", film noir, black and white, dramatic shadows"
+        elif style == 'scifi':
+            prompt += ", science fiction, futuristic, neon lights"
+        elif style == 'horror':
+            prompt += ", horror atmosphere, dark, eerie"
+        elif style == 'fantasy':
+            prompt += ", fantasy style, magical, ethereal"
+        elif style == 'documentary':
+            prompt += ", documentary style, realistic, natural"
+        elif style == 'anime':
+            prompt += ", anime style, vibrant colors, stylized"
+        else:
+            prompt += ", cinematic, film quality"
+        
+        return prompt
+    
     async def generate_scene_video(self, scene: Dict[str, Any], style: str = 'cinematic', quality: str = 'medium') -> Dict[str, Any]:
         """Generate video for a single scene using Replicate"""
         try:
             logger.info(f"Generating video for scene {scene['scene_number']}")
             start_time = time.time()
             
-            # Get the visual description
-            prompt = scene.get('visual_description', '')
-            
-            if not prompt:
-                prompt = f"{scene['type']} scene in {scene['location']}"
-            
-            # Add style modifiers
-            if style == 'realistic':
-                prompt += ", photorealistic, highly detailed"
-            elif style == 'animated':
-                prompt += ", animated style, cartoon, colorful"
-            elif style == 'noir':
-                prompt += ", film noir, black and white, dramatic shadows"
-            elif style == 'scifi':
-                prompt += ", science fiction, futuristic, neon lights"
-            elif style == 'horror':
-                prompt += ", horror atmosphere, dark, eerie"
-            elif style == 'fantasy':
-                prompt += ", fantasy style, magical, ethereal"
-            elif style == 'documentary':
-                prompt += ", documentary style, realistic, natural"
-            elif style == 'anime':
-                prompt += ", anime style, vibrant colors, stylized"
-            else:
-                prompt += ", cinematic, film quality"
+            prompt = self.build_prompt(scene, style)
             
             logger.info(f"Using prompt: {prompt[:100]}...")
             
@@ -66,12 +95,14 @@ class RenderEngine:
             # Try to generate real video
             try:
                 # Use Replicate's Stable Video Diffusion
-                output = replicate.run(
-                    "stability-ai/stable-video-diffusion:3f0457e4619daac51203dedb472816fd4af51f3149fa7a9e0b5ffcf1b8172438",
+                input_image = await self._generate_initial_image(prompt, quality)
+                output = await self.executor.run(
+                    replicate.run,
+                    VIDEO_MODEL,
                     input={
                         "cond_aug": 0.02,
                         "decoding_t": 7,
-                        "input_image": await self._generate_initial_image(prompt, quality),
+                        "input_image": input_image,
                         "video_length": "14_frames_with_svd",
                         "sizing_strategy": "maintain_aspect_ratio",
                         "motion_bucket_id": 127,
@@ -140,17 +171,12 @@ class RenderEngine:
         """Generate initial image for video generation"""
         try:
             # Adjust resolution based on quality
-            resolutions = {
-                'low': (768, 432),
-                'medium': (1024, 576),
-                'high': (1280, 720),
-                'ultra': (1920, 1080)
-            }
-            width, height = resolutions.get(quality, (1024, 576))
+            width, height = QUALITY_RESOLUTIONS.get(quality, QUALITY_RESOLUTIONS['medium'])
             
             # Use a text-to-image model to create the starting frame
-            output = replicate.run(
-                "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
+            output = await self.executor.run(
+                replicate.run,
+                IMAGE_MODEL,
                 input={
                     "prompt": prompt,
                     "width": width,
@@ -167,24 +193,45 @@ class RenderEngine:
             logger.error(f"Error generating initial image: {str(e)}")
             raise
     
-    async def render_all_scenes(self, scenes: List[Dict[str, Any]], style: str = 'cinematic', quality: str = 'medium') -> List[Dict[str, Any]]:
-        """Render videos for all scenes"""
-        rendered_scenes = []
-        
-        for scene in scenes:
-            try:
+    async def render_scene(self, scene: Dict[str, Any], style: str = 'cinematic', quality: str = 'medium') -> Dict[str, Any]:
+        """Render a single scene within the global render limit"""
+        async with self._render_slots:
+            return await self._render_scene(scene, style, quality)
+    
+    @property
+    def model_version(self) -> str:
+        """Identifies the models that produce renders, for cache keys"""
+        return 'demo' if self.demo_mode else f"{IMAGE_MODEL}|{VIDEO_MODEL}"
+    
+    async def _render_scene(self, scene: Dict[str, Any], style: str, quality: str) -> Dict[str, Any]:
+        """Render a single scene and store the result on the scene"""
+        try:
+            start_time = time.time()
+            cache_key = None
+            result = None
+            if self.render_cache:
+                cache_key = RenderCache.make_key(self.build_prompt(scene, style), style, quality, self.model_version)
+                result = await self.render_cache.get(cache_key)
+            
+            scene['render_cache_hit'] = result is not None
+            if result is not None:
+                logger.info(f"Reusing cached render for scene {scene['scene_number']}")
+                result = {**result, 'generation_time': time.time() - start_time}
+            else:
                 result = await self.generate_scene_video(scene, style, quality)
-                scene['video_url'] = result['video_url']
-                scene['generation_time'] = result['generation_time']
-                scene['file_size'] = result['file_size']
-                scene['quality'] = result.get('quality', quality)
-                scene['is_demo'] = result.get('is_demo', False)
-                scene['render_status'] = 'completed'
-                rendered_scenes.append(scene)
-            except Exception as e:
-                logger.error(f"Failed to render scene {scene['scene_number']}: {str(e)}")
-                scene['render_status'] = 'failed'
-                scene['error'] = str(e)
-                rendered_scenes.append(scene)
+                # Demo fallbacks of a real render must not be served as real results later
+                if cache_key and (self.demo_mode or not result.get('is_demo')):
+                    await self.render_cache.put(cache_key, result)
+            
+            scene['video_url'] = result['video_url']
+            scene['generation_time'] = result['generation_time']
+            scene['file_size'] = result['file_size']
+            scene['quality'] = result.get('quality', quality)
+            scene['is_demo'] = result.get('is_demo', False)
+            scene['render_status'] = 'completed'
+        except Exception as e:
+            logger.error(f"Failed to render scene {scene['scene_number']}: {str(e)}")
+            scene['render_status'] = 'failed'
+            scene['error'] = str(e)
         
-        return rendered_scenes
+        return scene
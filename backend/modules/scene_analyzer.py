@@ -0,0 +1,178 @@
+import logging
+from typing import Dict, List, Any
+from modules.keyword_rules import KeywordRules
+
+logger = logging.getLogger(__name__)
+
+# Keyword rules on the scene's action text, in priority order per category.
+# Values are keys of the lighting presets.
+SCENE_KEYWORD_RULES = [
+    ('lighting', 'dramatic', ['dark', 'night', 'shadow']),
+    ('lighting', 'candlelight', ['warm', 'cozy'])
+]
+
+class SceneAnalyzer:
+    """Derives visual description, camera, lighting and sound setup for scenes in one pass"""
+    
+    def __init__(self):
+        self.style_modifiers = {
+            'realistic': 'photorealistic, cinematic, high quality, 8k resolution',
+            'animated': 'animated, cartoon style, colorful, stylized',
+            'cinematic': 'cinematic, dramatic lighting, film quality, professional cinematography'
+        }
+        self.camera_presets = {
+            'wide': 'wide establishing shot',
+            'medium': 'medium shot',
+            'close': 'close-up shot',
+            'extreme_close': 'extreme close-up',
+            'over_shoulder': 'over the shoulder shot',
+            'pan': 'panning shot',
+            'tilt': 'tilting camera movement',
+            'dolly': 'dolly camera movement',
+            'crane': 'crane shot from above'
+        }
+        self.lighting_presets = {
+            'natural': 'natural daylight, soft shadows',
+            'dramatic': 'dramatic high-contrast lighting, strong shadows',
+            'soft': 'soft diffused lighting, minimal shadows',
+            'neon': 'neon lighting, vibrant colors',
+            'candlelight': 'warm candlelight, intimate atmosphere',
+            'moonlight': 'cool moonlight, mysterious atmosphere',
+            'golden_hour': 'golden hour lighting, warm tones',
+            'overcast': 'overcast lighting, even illumination'
+        }
+        self.sound_library = {
+            'ambient': {
+                'exterior': ['wind', 'birds chirping', 'traffic'],
+                'interior': ['room tone', 'clock ticking', 'distant sounds']
+            },
+            'music': {
+                'dramatic': 'dramatic orchestral score',
+                'action': 'intense action music',
+                'emotional': 'emotional piano melody',
+                'suspense': 'suspenseful ambient tones'
+            }
+        }
+        self.keyword_rules = KeywordRules(SCENE_KEYWORD_RULES)
+    
+    def analyze(self, scene: Dict[str, Any], style: str = 'cinematic') -> Dict[str, Any]:
+        """Analyze a scene and store all derived setups on it"""
+        try:
+            features = self._extract_features(scene)
+            
+            scene['visual_description'] = self._describe(scene, features, style)
+            scene['camera_setup'] = self._camera_setup(scene, features)
+            scene['lighting_setup'] = self._lighting_setup(scene, features)
+            scene['sound_design'] = self._sound_design(scene, features)
+            
+            logger.info(f"Analyzed scene {scene['scene_number']}")
+            return scene
+        
+        except Exception as e:
+            logger.error(f"Error analyzing scene: {str(e)}")
+            raise
+    
+    def analyze_scenes(self, scenes: List[Dict[str, Any]], style: str = 'cinematic') -> List[Dict[str, Any]]:
+        """Analyze all scenes"""
+        for scene in scenes:
+            self.analyze(scene, style)
+        return scenes
+    
+    def _extract_features(self, scene: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute the scene properties shared by all rules"""
+        actions = scene.get('actions') or []
+        dialogs = scene.get('dialogs') or []
+        return {
+            'exterior': scene['type'] == 'EXTERIOR',
+            'action_count': len(actions),
+            'dialog_count': len(dialogs),
+            # Matching rule value per category, e.g. {'lighting': 'dramatic'}
+            'keywords': self.keyword_rules.match(' '.join(actions).lower())
+        }
+    
+    def _describe(self, scene: Dict[str, Any], features: Dict[str, Any], style: str) -> str:
+        """Build a detailed scene description for image/video generation"""
+        description_parts = [f"{scene['type'].lower()} scene in {scene['location']}"]
+        
+        if scene.get('camera'):
+            description_parts.append(f"camera: {', '.join(scene['camera'])}")
+        
+        if scene.get('lighting'):
+            description_parts.append(f"lighting: {', '.join(scene['lighting'])}")
+        
+        if features['action_count']:
+            description_parts.append('. '.join(scene['actions'][:2]))  # Limit to first 2 actions
+        
+        if scene.get('characters'):
+            description_parts.append(f"featuring {', '.join(scene['characters'][:3])}")
+        
+        base_style = self.style_modifiers.get(style, self.style_modifiers['cinematic'])
+        full_description = f"{base_style}, {', '.join(description_parts)}"
+        return full_description[:1000]  # Limit length for API
+    
+    def _camera_setup(self, scene: Dict[str, Any], features: Dict[str, Any]) -> Dict[str, Any]:
+        """Determine camera shots and movements"""
+        camera_setup = {
+            'shots': [],
+            'movements': [],
+            'angles': []
+        }
+        
+        # Use explicit camera directions if provided
+        if scene.get('camera'):
+            camera_setup['shots'] = scene['camera']
+            return camera_setup
+        
+        if scene['scene_number'] == 1:
+            camera_setup['shots'].append(self.camera_presets['wide'])
+        
+        # Dialog scenes get medium/close-ups
+        if features['dialog_count']:
+            camera_setup['shots'].append(self.camera_presets['medium'])
+            if features['dialog_count'] > 2:
+                camera_setup['shots'].append(self.camera_presets['close'])
+        
+        # Action scenes get dynamic movements
+        if features['action_count'] > 1:
+            camera_setup['movements'].append(self.camera_presets['pan'])
+        
+        return camera_setup
+    
+    def _lighting_setup(self, scene: Dict[str, Any], features: Dict[str, Any]) -> Dict[str, Any]:
+        """Determine lighting type and mood"""
+        lighting_setup = {
+            'type': '',
+            'description': '',
+            'mood': ''
+        }
+        
+        # Use explicit lighting if provided
+        if scene.get('lighting'):
+            lighting_setup['description'] = ', '.join(scene['lighting'])
+            lighting_setup['type'] = 'custom'
+            return lighting_setup
+        
+        # Mood keywords in the actions override the location default
+        default_type = 'natural' if features['exterior'] else 'soft'
+        lighting_type = features['keywords'].get('lighting', default_type)
+        
+        lighting_setup['type'] = lighting_type
+        lighting_setup['description'] = self.lighting_presets[lighting_type]
+        return lighting_setup
+    
+    def _sound_design(self, scene: Dict[str, Any], features: Dict[str, Any]) -> Dict[str, Any]:
+        """Determine effects, ambient sound and music"""
+        ambient = self.sound_library['ambient']['exterior' if features['exterior'] else 'interior']
+        
+        if features['dialog_count'] > 2:
+            music = self.sound_library['music']['emotional']
+        elif features['action_count'] > 2:
+            music = self.sound_library['music']['action']
+        else:
+            music = self.sound_library['music']['dramatic']
+        
+        return {
+            'effects': scene['sound'] if scene.get('sound') else [],
+            'music': music,
+            'ambient': ambient
+        }
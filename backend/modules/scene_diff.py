@@ -0,0 +1,59 @@
+import logging
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class SceneDiffer:
+    """Matches revised screenplay scenes against a previous job's scenes"""
+    
+    def __init__(self):
+        # Parsed fields that determine every downstream stage output
+        self.content_fields = ['type', 'location', 'dialogs', 'actions', 'camera', 'lighting', 'sound']
+    
+    def fingerprint(self, scene: Dict[str, Any]) -> str:
+        """Hash the parsed content of a scene"""
+        content = {field: scene.get(field, []) for field in self.content_fields}
+        content['characters'] = sorted(scene.get('characters', []))
+        # The opening scene gets an establishing shot, so position 1 is part of the content
+        content['opening'] = scene.get('scene_number') == 1
+        payload = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def diff(self, previous_scenes: List[Dict[str, Any]], revised_scenes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge revised scenes with reusable previous results
+        
+        Returns the merged scene list, where unchanged scenes carry their
+        previous downstream results (description, analysis, audio, video), and
+        the indices of scenes that still need processing.
+        """
+        try:
+            available = defaultdict(list)
+            for scene in previous_scenes:
+                if scene.get('render_status') == 'completed':
+                    available[self.fingerprint(scene)].append(scene)
+            
+            merged = []
+            changed = []
+            for index, scene in enumerate(revised_scenes):
+                matches = available.get(self.fingerprint(scene))
+                if matches:
+                    reused = dict(matches.pop(0))
+                    reused['reused_from_scene'] = reused['scene_number']
+                    reused['scene_number'] = scene['scene_number']
+                    merged.append(reused)
+                else:
+                    merged.append(scene)
+                    changed.append(index)
+            
+            logger.info(f"Scene diff: {len(revised_scenes) - len(changed)} unchanged, {len(changed)} changed")
+            return {
+                'scenes': merged,
+                'changed': changed
+            }
+        
+        except Exception as e:
+            logger.error(f"Error diffing scenes: {str(e)}")
+            raise
@@ -1,9 +1,25 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Scene heading: INT./EXT. followed by whitespace, anywhere in the text
+HEADING_PATTERN = re.compile(r'(INT\.|EXT\.)\s+')
+LOCATION_PATTERN = re.compile(r'([^\n-]+)')
+# Camera, lighting and sound directions in one pass over a line. Each branch
+# looks for its first occurrence anywhere in the line, and camera takes
+# precedence over lighting over sound.
+DIRECTIVE_PATTERN = re.compile(
+    r'(?=.*?(?:KAMERA|CAMERA):\s*(.+))'
+    r'|(?=.*?(?:LICHT|LIGHT):\s*(.+))'
+    r'|(?=.*?(?:SOUND|TON):\s*(.+))',
+    re.IGNORECASE
+)
+DIRECTIVE_FIELDS = ('camera', 'lighting', 'sound')
+# Length of a heading token; an unfinished heading starts at most this far before the end of the buffer
+HEADING_TOKEN_LENGTH = 4
+
 class SceneParser:
     """Parses screenplay text and extracts scenes with metadata"""
     
@@ -21,77 +37,116 @@ class SceneParser:
         """Parse screenplay into structured scenes"""
         try:
             logger.info("Starting screenplay parsing")
-            scenes = []
-            
-            # Split by scene headings
-            scene_splits = re.split(r'(INT\.|EXT\.)\s+', screenplay_text)
-            
-            current_scene = None
-            for i in range(1, len(scene_splits), 2):
-                if i + 1 < len(scene_splits):
-                    scene_type = scene_splits[i].strip()
-                    scene_content = scene_splits[i + 1]
-                    
-                    # Extract scene location
-                    location_match = re.match(r'([^\n-]+)', scene_content)
-                    location = location_match.group(1).strip() if location_match else "Unknown"
-                    
-                    scene = {
-                        'scene_number': len(scenes) + 1,
-                        'type': 'INTERIOR' if scene_type == 'INT.' else 'EXTERIOR',
-                        'location': location,
-                        'dialogs': [],
-                        'actions': [],
-                        'camera': [],
-                        'lighting': [],
-                        'sound': [],
-                        'characters': set()
-                    }
-                    
-                    # Parse scene content
-                    lines = scene_content.split('\n')
-                    for j, line in enumerate(lines):
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        # Check for camera direction
-                        camera_match = re.search(self.scene_patterns['camera'], line, re.IGNORECASE)
-                        if camera_match:
-                            scene['camera'].append(camera_match.group(2).strip())
-                            continue
-                        
-                        # Check for lighting
-                        light_match = re.search(self.scene_patterns['light'], line, re.IGNORECASE)
-                        if light_match:
-                            scene['lighting'].append(light_match.group(2).strip())
-                            continue
-                        
-                        # Check for sound
-                        sound_match = re.search(self.scene_patterns['sound'], line, re.IGNORECASE)
-                        if sound_match:
-                            scene['sound'].append(sound_match.group(2).strip())
-                            continue
-                        
-                        # Check for dialog (character name in all caps)
-                        if line.isupper() and len(line) > 2 and j + 1 < len(lines):
-                            character = line.strip()
-                            dialog_text = lines[j + 1].strip() if j + 1 < len(lines) else ""
-                            scene['dialogs'].append({
-                                'character': character,
-                                'text': dialog_text
-                            })
-                            scene['characters'].add(character)
-                        # Action description
-                        elif not line.isupper() and len(line) > 10:
-                            scene['actions'].append(line)
-                    
-                    scene['characters'] = list(scene['characters'])
-                    scenes.append(scene)
-            
+            scenes = list(self.iter_scenes(screenplay_text))
             logger.info(f"Parsed {len(scenes)} scenes from screenplay")
             return scenes
-            
+        
         except Exception as e:
             logger.error(f"Error parsing screenplay: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    def iter_scenes(self, source: Union[str, Iterable[str]]) -> Iterator[Dict[str, Any]]:
+        """Parse screenplay text incrementally, yielding each scene once it is complete
+        
+        source is either the whole screenplay or an iterable of text chunks
+        (e.g. an open file, which yields lines). A scene is complete as soon
+        as the next scene heading has been read, so consumers can start on
+        early scenes while the rest of the script is still being read.
+        """
+        chunks = [source] if isinstance(source, str) else source
+        
+        buffer = ''
+        search_from = 0
+        open_scene = None  # (scene type, content start in buffer) of the scene being read
+        scene_number = 0
+        
+        for chunk in chunks:
+            buffer += chunk
+            
+            while True:
+                match = HEADING_PATTERN.search(buffer, search_from)
+                # A heading at the very end may still grow (more whitespace) or be cut off
+                if not match or match.end() == len(buffer):
+                    break
+                
+                if open_scene:
+                    scene_number += 1
+                    yield self._build_scene(open_scene[0], buffer[open_scene[1]:match.start()], scene_number)
+                
+                open_scene = (match.group(1), match.end())
+                search_from = match.end()
+            
+            if match:
+                search_from = match.start()
+            else:
+                search_from = max(search_from, len(buffer) - HEADING_TOKEN_LENGTH)
+            
+            # Drop consumed text; text before the first heading is never part of a scene
+            keep_from = open_scene[1] if open_scene else search_from
+            if keep_from:
+                buffer = buffer[keep_from:]
+                search_from -= keep_from
+                if open_scene:
+                    open_scene = (open_scene[0], 0)
+        
+        # End of input: every remaining heading is complete
+        for match in HEADING_PATTERN.finditer(buffer, search_from):
+            if open_scene:
+                scene_number += 1
+                yield self._build_scene(open_scene[0], buffer[open_scene[1]:match.start()], scene_number)
+            open_scene = (match.group(1), match.end())
+        
+        if open_scene:
+            scene_number += 1
+            yield self._build_scene(open_scene[0], buffer[open_scene[1]:], scene_number)
+    
+    def _build_scene(self, scene_type: str, scene_content: str, scene_number: int) -> Dict[str, Any]:
+        """Build a scene from the text following its heading"""
+        # Extract scene location
+        location_match = LOCATION_PATTERN.match(scene_content)
+        location = location_match.group(1).strip() if location_match else "Unknown"
+        
+        scene = {
+            'scene_number': scene_number,
+            'type': 'INTERIOR' if scene_type == 'INT.' else 'EXTERIOR',
+            'location': location,
+            'dialogs': [],
+            'actions': [],
+            'camera': [],
+            'lighting': [],
+            'sound': [],
+            'characters': []
+        }
+        # Ordered set of character names, in order of first appearance
+        characters = {}
+        
+        # Parse scene content
+        lines = scene_content.split('\n')
+        last_line = len(lines) - 1
+        for j, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Check for camera, lighting or sound direction
+            if ':' in line:
+                directive = DIRECTIVE_PATTERN.match(line)
+                if directive:
+                    index = directive.lastindex
+                    scene[DIRECTIVE_FIELDS[index - 1]].append(directive.group(index).strip())
+                    continue
+            
+            # Check for dialog (character name in all caps)
+            is_upper = line.isupper()
+            if is_upper and len(line) > 2 and j < last_line:
+                scene['dialogs'].append({
+                    'character': line,
+                    'text': lines[j + 1].strip()
+                })
+                characters[line] = None
+            # Action description
+            elif not is_upper and len(line) > 10:
+                scene['actions'].append(line)
+        
+        scene['characters'] = list(characters)
+        return scene
@@ -1,55 +1,166 @@
 import logging
-from typing import List, Dict, Any
-import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Estimates for what has no measured duration
+DIALOG_ESTIMATE = 3.0  # Dialog line without a synthesized clip
+ACTION_DURATION = 2.0  # Per action description
+MIN_SCENE_DURATION = 5.0
+# Pause between consecutive dialog clips
+DIALOG_GAP = 0.3
+
 class TimelineManager:
-    """Manages timeline and synchronization of scenes"""
+    """Manages timeline and synchronization of scenes
+    
+    Indexes of completed jobs' timelines, which never change, are kept for
+    the max_cached_indexes most recently used jobs.
+    """
     
-    def __init__(self):
-        self.timeline = []
-        self.total_duration = 0
+    def __init__(self, max_cached_indexes: int = 256):
+        self.max_cached_indexes = max_cached_indexes
+        self._indexes: 'OrderedDict[str, TimelineIndex]' = OrderedDict()
     
     def create_timeline(self, scenes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Create timeline with all scenes"""
+        """Create timeline with all scenes
+        
+        Dialog clips are placed one after another from the start of their
+        scene using their measured durations; a scene lasts as long as its
+        dialog plus its actions, but at least MIN_SCENE_DURATION.
+        """
         try:
             timeline = []
-            current_time = 0
+            current_time = 0.0
             
             for scene in scenes:
-                # Calculate scene duration (estimate)
-                dialog_duration = len(scene.get('dialogs', [])) * 3  # ~3 seconds per dialog
-                action_duration = len(scene.get('actions', [])) * 2  # ~2 seconds per action
-                base_duration = max(5, dialog_duration + action_duration)  # Minimum 5 seconds
+                audio_clips = []
+                clip_time = current_time
+                for clip in scene.get('audio_clips', []):
+                    duration = clip.get('duration') or DIALOG_ESTIMATE
+                    audio_clips.append({
+                        **clip,
+                        'start_time': round(clip_time, 3),
+                        'end_time': round(clip_time + duration, 3)
+                    })
+                    clip_time += duration + DIALOG_GAP
+                
+                # Dialog lines whose synthesis failed still take their estimated time
+                missing_dialogs = max(0, len(scene.get('dialogs', [])) - len(audio_clips))
+                dialog_duration = (clip_time - current_time) + missing_dialogs * DIALOG_ESTIMATE
+                action_duration = len(scene.get('actions', [])) * ACTION_DURATION
+                duration = max(MIN_SCENE_DURATION, dialog_duration + action_duration)
                 
                 timeline_entry = {
                     'scene_number': scene['scene_number'],
-                    'start_time': current_time,
-                    'duration': base_duration,
-                    'end_time': current_time + base_duration,
+                    'start_time': round(current_time, 3),
+                    'duration': round(duration, 3),
+                    'end_time': round(current_time + duration, 3),
                     'video_url': scene.get('video_url', ''),
-                    'audio_clips': scene.get('audio_clips', []),
+                    'audio_clips': audio_clips,
                     'transitions': 'fade'
                 }
                 
                 timeline.append(timeline_entry)
-                current_time += base_duration
-            
-            self.timeline = timeline
-            self.total_duration = current_time
+                current_time += duration
             
-            logger.info(f"Created timeline with {len(timeline)} scenes, total duration: {self.total_duration}s")
+            logger.info(f"Created timeline with {len(timeline)} scenes, total duration: {current_time:.1f}s")
             return timeline
-            
+        
         except Exception as e:
             logger.error(f"Error creating timeline: {str(e)}")
             raise
     
-    def get_timeline_info(self) -> Dict[str, Any]:
+    def get_timeline_info(self, timeline: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Get timeline information"""
         return {
-            'total_scenes': len(self.timeline),
-            'total_duration': self.total_duration,
-            'timeline': self.timeline
-        }
\ No newline at end of file
+            'total_scenes': len(timeline),
+            'total_duration': timeline[-1]['end_time'] if timeline else 0,
+            'timeline': timeline
+        }
+    
+    def cached_index(self, job_id: str) -> Optional['TimelineIndex']:
+        """Index of a job's final timeline, if it is cached"""
+        index = self._indexes.get(job_id)
+        if index is not None:
+            self._indexes.move_to_end(job_id)
+        return index
+    
+    def index_job(self, job_id: str, timeline: List[Dict[str, Any]]) -> 'TimelineIndex':
+        """Index a job's final timeline and cache the index"""
+        index = self._indexes[job_id] = self.build_index(timeline)
+        self._indexes.move_to_end(job_id)
+        while len(self._indexes) > self.max_cached_indexes:
+            self._indexes.popitem(last=False)
+        return index
+    
+    def build_index(self, timeline: List[Dict[str, Any]]) -> 'TimelineIndex':
+        """Index the scenes and dialog clips of a timeline by time"""
+        intervals = []
+        for entry in timeline:
+            intervals.append((entry['start_time'], entry['end_time'], {
+                'type': 'scene',
+                'scene_number': entry['scene_number'],
+                'start_time': entry['start_time'],
+                'end_time': entry['end_time'],
+                'video_url': entry.get('video_url', '')
+            }))
+            for clip in entry.get('audio_clips', []):
+                intervals.append((clip['start_time'], clip['end_time'], {
+                    'type': 'dialog',
+                    'scene_number': entry['scene_number'],
+                    **clip
+                }))
+        return TimelineIndex(intervals)
+
+class TimelineIndex:
+    """Static interval tree answering "what is playing at t" queries
+    
+    Intervals are half-open [start, end). They are kept sorted by start in an
+    implicit balanced tree (the middle of each range is its root), augmented
+    with the largest end in every subtree, so a query visits O(log n + k)
+    nodes for k results.
+    """
+    
+    def __init__(self, intervals: List[Tuple[float, float, Dict[str, Any]]]):
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in intervals]
+        self._ends = [interval[1] for interval in intervals]
+        self._items = [interval[2] for interval in intervals]
+        self._max_end = list(self._ends)
+        self._build(0, len(intervals))
+        self.duration = max(self._ends, default=0)
+    
+    def at(self, t: float) -> List[Dict[str, Any]]:
+        """Everything playing at time t, in order of start time"""
+        return self.overlapping(t, t)
+    
+    def overlapping(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Everything playing at any time in [start, end], in order of start time"""
+        results: List[int] = []
+        self._query(0, len(self._starts), start, end, results)
+        return [self._items[i] for i in results]
+    
+    def __len__(self) -> int:
+        return len(self._starts)
+    
+    def _build(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        return self._max_end[mid]
+    
+    def _query(self, lo: int, hi: int, start: float, end: float, results: List[int]):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        # Nothing in this subtree lasts past start
+        if self._max_end[mid] <= start:
+            return
+        self._query(lo, mid, start, end, results)
+        if self._starts[mid] > end:
+            return  # Everything to the right starts even later
+        if self._ends[mid] > start:
+            results.append(mid)
+        self._query(mid + 1, hi, start, end, results)
@@ -1,73 +1,177 @@
 import logging
 import os
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 import asyncio
+import time
 from emergentintegrations.llm.chat import LlmChat, UserMessage
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError
+from modules.provider_executor import ProviderExecutor
+from modules.audio_cache import AudioCache
+from modules.media_store import MediaStore
+from modules.audio_probe import mp3_duration
+from modules.character_ai import cast_voices, voice_order
 
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying: network trouble, throttling and provider-side failures
+TRANSIENT_TTS_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
 class VoiceAI:
     """Generates AI voices for character dialogs"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, executor: Optional[ProviderExecutor] = None, max_concurrent_requests: int = 8,
+                 requests_per_second: float = 0, max_retries: int = 3, retry_delay: float = 1.0,
+                 audio_cache: Optional[AudioCache] = None, media_store: Optional[MediaStore] = None):
         self.api_key = api_key
         self.client = OpenAI(api_key=api_key)
-        self.voice_mapping = {}
+        self.tts_model = "tts-1"
+        # The OpenAI client is synchronous, so TTS calls run on a dedicated executor
+        self.executor = executor or ProviderExecutor('tts')
+        self.audio_cache = audio_cache
+        # Where synthesized clips go; without a store clips carry their audio bytes.
+        # The audio cache indexes clips in its media store, so caching implies storing there
+        self.media_store = media_store or (audio_cache.media_store if audio_cache else None)
         self.available_voices = ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']
+        
+        # Rate limiting for batched synthesis (requests_per_second 0 = unlimited)
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self._request_slots = asyncio.Semaphore(self.max_concurrent_requests)
+        self._min_request_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_request_at = 0.0
+        self._pacing_lock = asyncio.Lock()
     
-    def assign_voices(self, characters: Dict[str, Dict]) -> Dict[str, str]:
-        """Assign voices to characters"""
+    def assign_voices(self, characters: Iterable[str], taken: Iterable[str] = ()) -> Dict[str, str]:
+        """Assign voices to characters, returning a new character -> voice mapping
+        
+        Voices already used by the cast are passed as taken; see cast_voices.
+        """
         try:
-            char_list = list(characters.keys())
-            for i, char in enumerate(char_list):
-                voice = self.available_voices[i % len(self.available_voices)]
-                self.voice_mapping[char] = voice
-            
-            logger.info(f"Assigned voices to {len(self.voice_mapping)} characters")
-            return self.voice_mapping
+            voice_mapping = cast_voices(characters, self.available_voices, taken)
+            logger.info(f"Assigned voices to {len(voice_mapping)} characters")
+            return voice_mapping
             
         except Exception as e:
             logger.error(f"Error assigning voices: {str(e)}")
             raise
     
-    async def generate_speech(self, text: str, character: str) -> bytes:
+    def voice_for(self, character: str) -> str:
+        """Voice for a character, derived from its name so it is the same in every job and process"""
+        return voice_order(character, self.available_voices)[0]
+    
+    async def generate_speech(self, text: str, voice: str) -> bytes:
         """Generate speech audio for dialog"""
         try:
-            voice = self.voice_mapping.get(character, 'alloy')
-            
-            response = self.client.audio.speech.create(
-                model="tts-1",
+            response = await self.executor.run(
+                self.client.audio.speech.create,
+                model=self.tts_model,
                 voice=voice,
                 input=text
             )
             
             audio_content = response.content
-            logger.info(f"Generated speech for character {character}")
+            logger.info(f"Generated speech for voice {voice}")
             return audio_content
             
         except Exception as e:
             logger.error(f"Error generating speech: {str(e)}")
             raise
     
-    async def generate_scene_audio(self, scene: Dict) -> List[Dict]:
+    async def generate_scene_audio(self, scene: Dict, voice_mapping: Optional[Dict[str, str]] = None) -> List[Dict]:
         """Generate audio for all dialogs in a scene"""
-        audio_clips = []
+        scene_clips = await self.synthesize_dialogs([scene], voice_mapping)
+        return scene_clips[0]
+    
+    async def synthesize_dialogs(self, scenes: List[Dict], voice_mapping: Optional[Dict[str, str]] = None) -> List[List[Dict]]:
+        """Generate audio for all dialogs of all scenes at once
+        
+        Every dialog line is submitted concurrently under the request rate
+        limit. voice_mapping is the job's character -> voice assignment;
+        characters missing from it get their default voice. Returns one list
+        of audio clips per scene, in scene and dialog order. Lines that still
+        fail after retrying are left out.
         
-        for dialog in scene.get('dialogs', []):
+        With a media store, each clip is written to the store as soon as it
+        is synthesized and only its reference (audio_ref) and duration are
+        returned, so audio is never held in memory for a whole job.
+        """
+        voice_mapping = voice_mapping or {}
+        lines = [
+            (scene_index, dialog)
+            for scene_index, scene in enumerate(scenes)
+            for dialog in scene.get('dialogs', [])
+        ]
+        
+        logger.info(f"Synthesizing {len(lines)} dialog lines across {len(scenes)} scenes")
+        results = await asyncio.gather(*(
+            self._synthesize_line(dialog, voice_mapping.get(dialog['character']) or self.voice_for(dialog['character']))
+            for _, dialog in lines
+        ))
+        
+        scene_clips: List[List[Dict]] = [[] for _ in scenes]
+        for (scene_index, _), clip in zip(lines, results):
+            if clip is not None:
+                scene_clips[scene_index].append(clip)
+        
+        return scene_clips
+    
+    async def _synthesize_line(self, dialog: Dict, voice: str) -> Optional[Dict]:
+        """Synthesize one dialog line, retrying transient failures"""
+        clip = {
+            'character': dialog['character'],
+            'text': dialog['text'],
+            'voice': voice
+        }
+        cache_key = None
+        if self.audio_cache:
+            # Cached lines reuse the stored clip without a TTS request
+            cache_key = AudioCache.make_key(self.tts_model, voice, dialog['text'])
+            cached = await asyncio.to_thread(self.audio_cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Using cached speech for voice {voice}")
+                return {**clip, **cached}
+        
+        attempt = 0
+        while True:
             try:
-                audio_data = await self.generate_speech(
-                    dialog['text'],
-                    dialog['character']
-                )
+                async with self._request_slots:
+                    await self._wait_for_request_slot()
+                    audio_data = await self.generate_speech(dialog['text'], voice)
                 
-                audio_clips.append({
-                    'character': dialog['character'],
-                    'text': dialog['text'],
-                    'audio_data': audio_data,
-                    'voice': self.voice_mapping.get(dialog['character'], 'alloy')
-                })
+                if self.media_store:
+                    clip['audio_ref'], clip['duration'] = await asyncio.to_thread(self._store_clip, audio_data)
+                    if cache_key:
+                        await asyncio.to_thread(self.audio_cache.put, cache_key, clip['audio_ref'], clip['duration'])
+                else:
+                    clip['audio_data'] = audio_data
+                    clip['duration'] = mp3_duration(audio_data)
+                return clip
+            except TRANSIENT_TTS_ERRORS as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"Giving up on dialog for {dialog['character']} after {attempt + 1} attempts: {str(e)}")
+                    return None
+                delay = self.retry_delay * (2 ** attempt)
+                attempt += 1
+                logger.warning(f"Transient TTS error for {dialog['character']}, retry {attempt} in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
             except Exception as e:
                 logger.error(f"Error generating audio for dialog: {str(e)}")
+                return None
+    
+    def _store_clip(self, audio_data: bytes) -> Tuple[str, Optional[float]]:
+        """Write a clip to the media store, returning its reference and duration"""
+        return self.media_store.put(audio_data, 'mp3'), mp3_duration(audio_data)
+    
+    async def _wait_for_request_slot(self):
+        """Space out request starts to respect requests_per_second"""
+        if not self._min_request_interval:
+            return
+        
+        async with self._pacing_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self._min_request_interval
         
-        return audio_clips
\ No newline at end of file
+        if wait > 0:
+            await asyncio.sleep(wait)
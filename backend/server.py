@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse, RedirectResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -7,23 +7,34 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
 import asyncio
+import json
 import time
 
 # Import all modules
 from modules.scene_parser import SceneParser
-from modules.scene_builder import SceneBuilder
-from modules.character_ai import CharacterAI
+from modules.scene_analyzer import SceneAnalyzer
 from modules.voice_ai import VoiceAI
-from modules.camera_ai import CameraAI
-from modules.lighting_ai import LightingAI
-from modules.sound_ai import SoundAI
 from modules.render_engine import RenderEngine
 from modules.timeline_manager import TimelineManager
 from modules.export_module import ExportModule
+from modules.film_assembler import FilmAssembler
+from modules.download_manager import DownloadManager
+from modules.provider_executor import ProviderExecutor
+from modules.audio_cache import AudioCache
+from modules.media_store import MediaStore, REF_PATTERN
+from modules.media_response import media_file_response
+from modules.render_cache import RenderCache
+from modules.scene_diff import SceneDiffer
+from modules.job_queue import JobQueue
+from modules.job_dedup import JobDeduplicator
+from modules.progress_broker import ProgressBroker
+from modules.progress_writer import ProgressWriter
+from modules.film_pipeline import FilmPipeline
+from modules.batch_analysis import BatchAnalyzer
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -50,16 +61,124 @@ logger = logging.getLogger(__name__)
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 REPLICATE_API_TOKEN = os.environ.get('REPLICATE_API_TOKEN')
 
+# Render concurrency: global limit across all jobs and default limit per job
+RENDER_MAX_CONCURRENCY = int(os.environ.get('RENDER_MAX_CONCURRENCY', '4'))
+RENDER_JOB_CONCURRENCY = int(os.environ.get('RENDER_JOB_CONCURRENCY', '4'))
+
+# Dedicated thread pools for blocking provider SDK calls
+replicate_executor = ProviderExecutor('replicate', max_workers=int(os.environ.get('REPLICATE_EXECUTOR_WORKERS', str(RENDER_MAX_CONCURRENCY))))
+tts_executor = ProviderExecutor('tts', max_workers=int(os.environ.get('TTS_EXECUTOR_WORKERS', '8')))
+
+# Batched TTS synthesis: concurrent requests, request rate (0 = unlimited) and retries per line
+TTS_MAX_CONCURRENCY = int(os.environ.get('TTS_MAX_CONCURRENCY', '8'))
+TTS_REQUESTS_PER_SECOND = float(os.environ.get('TTS_REQUESTS_PER_SECOND', '0'))
+TTS_MAX_RETRIES = int(os.environ.get('TTS_MAX_RETRIES', '3'))
+
+# Streaming scene pipeline: scenes buffered between stages and scenes voiced at once per job
+# (0 = TTS_MAX_CONCURRENCY, so short scenes still use every TTS slot)
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', '4'))
+PIPELINE_VOICE_WORKERS = int(os.environ.get('PIPELINE_VOICE_WORKERS', '0')) or None
+
+# Content-addressed store for generated media (synthesized dialog clips)
+media_store = MediaStore(os.environ.get('MEDIA_STORE_DIR', str(ROOT_DIR / 'media')))
+
+# Persistent TTS audio cache: (model, voice, text) -> clip already in the media store,
+# keeping up to AUDIO_CACHE_MAX_MB of clips for reuse
+audio_cache = AudioCache(
+    media_store,
+    index_dir=os.environ.get('AUDIO_CACHE_DIR', str(ROOT_DIR / 'audio_cache')),
+    max_disk_bytes=int(os.environ.get('AUDIO_CACHE_MAX_MB', '512')) * 1024 * 1024
+)
+
+# Dialog clips referenced by neither a job nor the audio cache are deleted every
+# MEDIA_GC_INTERVAL_SECONDS (0 disables), once older than MEDIA_GC_GRACE_SECONDS
+MEDIA_GC_INTERVAL_SECONDS = int(os.environ.get('MEDIA_GC_INTERVAL_SECONDS', '3600'))
+MEDIA_GC_GRACE_SECONDS = int(os.environ.get('MEDIA_GC_GRACE_SECONDS', '86400'))
+
+# Job execution: 'inline' runs jobs as tasks in the API process,
+# 'queue' leaves them in MongoDB for worker processes (see worker.py)
+JOB_RUNNER = os.environ.get('JOB_RUNNER', 'inline')
+job_queue = JobQueue(
+    db.film_jobs,
+    lease_seconds=int(os.environ.get('JOB_LEASE_SECONDS', '60')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+)
+
+# Identical film requests within the window attach to the existing job (0 disables);
+# processing jobs without progress or heartbeat for DEDUP_STALE_SECONDS are not reused
+job_dedup = JobDeduplicator(
+    db.film_jobs,
+    window_seconds=int(os.environ.get('DEDUP_WINDOW_SECONDS', '600')),
+    stale_seconds=int(os.environ.get('DEDUP_STALE_SECONDS', '300'))
+)
+
+async def fetch_job_progress(job_id: str) -> Optional[Dict[str, Any]]:
+    return await db.film_jobs.find_one({"id": job_id}, {"_id": 0, "status": 1, "progress": 1, "error": 1})
+
+# Push-based progress for streaming clients; in queue mode the jobs run in
+# workers, so one poller per watched job feeds the broker instead
+progress_broker = ProgressBroker(
+    fetch_status=fetch_job_progress if JOB_RUNNER == 'queue' else None,
+    poll_interval=float(os.environ.get('PROGRESS_POLL_INTERVAL', '1'))
+)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Progress writes are merged per job and written at most once per interval
+progress_writer = ProgressWriter(
+    db.film_jobs,
+    min_interval=float(os.environ.get('PROGRESS_WRITE_INTERVAL', '1'))
+)
+
+# Render result cache shared by all jobs; provider URLs expire, so entries do too
+render_cache = RenderCache(
+    collection=db.render_cache,
+    ttl_seconds=int(os.environ.get('RENDER_CACHE_TTL_SECONDS', '3600'))
+)
+
 scene_parser = SceneParser()
-scene_builder = SceneBuilder()
-character_ai = CharacterAI()
-voice_ai = VoiceAI(api_key=EMERGENT_LLM_KEY)
-camera_ai = CameraAI()
-lighting_ai = LightingAI()
-sound_ai = SoundAI()
-render_engine = RenderEngine(replicate_token=REPLICATE_API_TOKEN, demo_mode=True)  # Demo mode enabled
+scene_analyzer = SceneAnalyzer()
+voice_ai = VoiceAI(
+    api_key=EMERGENT_LLM_KEY,
+    executor=tts_executor,
+    max_concurrent_requests=TTS_MAX_CONCURRENCY,
+    requests_per_second=TTS_REQUESTS_PER_SECOND,
+    max_retries=TTS_MAX_RETRIES,
+    audio_cache=audio_cache,
+    media_store=media_store
+)
+render_engine = RenderEngine(
+    replicate_token=REPLICATE_API_TOKEN,
+    demo_mode=True,  # Demo mode enabled
+    max_concurrent_renders=RENDER_MAX_CONCURRENCY,
+    max_job_concurrency=RENDER_JOB_CONCURRENCY,
+    executor=replicate_executor,
+    render_cache=render_cache
+)
 timeline_manager = TimelineManager()
-export_module = ExportModule()
+# Film assembly with ffmpeg (scene videos + dialog into one MP4), off by default
+FILM_ASSEMBLY_ENABLED = os.environ.get('FILM_ASSEMBLY_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+film_assembler = FilmAssembler(
+    media_store,
+    max_concurrent=int(os.environ.get('FILM_ASSEMBLY_MAX_CONCURRENCY', '2'))
+) if FILM_ASSEMBLY_ENABLED else None
+# Scene video downloads for export share one pooled HTTP client
+download_manager = DownloadManager(
+    max_concurrent=int(os.environ.get('DOWNLOAD_MAX_CONCURRENCY', '4')),
+    chunk_size=int(os.environ.get('DOWNLOAD_CHUNK_KB', '1024')) * 1024
+)
+export_module = ExportModule(assembler=film_assembler, downloader=download_manager)
+# 'local' copies scene videos into the media store on export and serves them from /api/media
+if os.environ.get('CLOUD_STORAGE_PROVIDER') == 'local':
+    export_module.enable_cloud_storage('local', {'media_store': media_store, 'base_url': '/api/media'})
+scene_differ = SceneDiffer()
+batch_analyzer = BatchAnalyzer(max_workers=int(os.environ.get('BATCH_ANALYSIS_WORKERS', '0')) or None)
+# Batch-enqueued jobs running at once in inline mode; use queue mode with workers for large archives
+batch_job_slots = asyncio.Semaphore(int(os.environ.get('BATCH_INLINE_JOB_CONCURRENCY', '2')))
+film_pipeline = FilmPipeline(
+    scene_analyzer, voice_ai, render_engine,
+    queue_size=PIPELINE_QUEUE_SIZE,
+    voice_workers=PIPELINE_VOICE_WORKERS
+)
 
 # Models
 class FilmGenerationRequest(BaseModel):
@@ -67,10 +186,27 @@ class FilmGenerationRequest(BaseModel):
     style: str = Field(default="cinematic", description="Film style")
     quality: str = Field(default="medium", description="Video quality: low, medium, high, ultra")
 
+class FilmRegenerationRequest(BaseModel):
+    screenplay: str = Field(..., description="The revised screenplay text")
+    style: Optional[str] = Field(default=None, description="Film style, defaults to the previous job's style")
+    quality: Optional[str] = Field(default=None, description="Video quality, defaults to the previous job's quality")
+
+class BatchScreenplay(BaseModel):
+    screenplay: str = Field(..., description="The screenplay text")
+    name: Optional[str] = Field(default=None, description="Name to identify the screenplay in the results")
+    style: str = Field(default="cinematic", description="Film style")
+    quality: str = Field(default="medium", description="Video quality: low, medium, high, ultra")
+
+class BatchAnalysisRequest(BaseModel):
+    screenplays: List[BatchScreenplay]
+    enqueue: bool = Field(default=True, description="Start a film generation job for every analyzed screenplay")
+    include_scenes: bool = Field(default=False, description="Include the analyzed scenes in the results")
+
 class FilmGenerationResponse(BaseModel):
     job_id: str
     status: str
     message: str
+    deduplicated: bool = False
 
 class FilmJob(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -91,6 +227,8 @@ class FilmJob(BaseModel):
     generation_duration: Optional[float] = None
     total_file_size: Optional[int] = None
     error: Optional[str] = None
+    parent_job_id: Optional[str] = None
+    fingerprint: Optional[str] = None
 
 class JobStatusResponse(BaseModel):
     job_id: str
@@ -105,6 +243,22 @@ class JobStatusResponse(BaseModel):
     total_file_size: Optional[int] = None
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
+
+# Fields needed for job status responses; never load screenplay, scenes or timeline for these
+JOB_STATUS_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "status": 1,
+    "progress": 1,
+    "export_info": 1,
+    "error": 1,
+    "generation_duration": 1,
+    "total_file_size": 1,
+    "started_at": 1,
+    "completed_at": 1,
+    "metrics": 1
+}
 
 @api_router.get("/")
 async def root():
@@ -114,56 +268,146 @@ async def root():
         "status": "operational",
         "features": {
             "direct_streaming": True,
-            "cloud_storage": False,
+            "cloud_storage": export_module.cloud_storage is not None,
             "demo_mode": True,
             "quality_settings": ["low", "medium", "high", "ultra"],
             "styles": ["cinematic", "realistic", "animated", "noir", "scifi", "horror", "fantasy", "documentary", "anime"]
         }
     }
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """Get runtime metrics for provider executors"""
+    return {
+        "executors": {
+            "replicate": replicate_executor.get_stats(),
+            "tts": tts_executor.get_stats()
+        },
+        "audio_cache": audio_cache.get_stats(),
+        "media_store": media_store.get_stats(),
+        "render_cache": render_cache.get_stats(),
+        "progress_streams": progress_broker.get_stats(),
+        "progress_writes": progress_writer.get_stats(),
+        "batch_analysis": batch_analyzer.get_stats(),
+        "film_assembly": film_assembler.get_stats() if film_assembler else None,
+        "downloads": download_manager.get_stats(),
+        "job_dedup": job_dedup.get_stats()
+    }
+
 @api_router.post("/generate-film", response_model=FilmGenerationResponse)
 async def generate_film(request: FilmGenerationRequest):
-    """Generate a complete film from screenplay"""
+    """Generate a complete film from screenplay; repeated identical requests get the existing job"""
     try:
-        job_id = str(uuid.uuid4())
-        started_at = datetime.now(timezone.utc)
-        
-        # Create job entry
-        job = FilmJob(
-            id=job_id,
-            screenplay=request.screenplay,
-            style=request.style,
-            quality=request.quality,
-            status="processing",
-            progress=0,
-            started_at=started_at
+        fingerprint = JobDeduplicator.make_fingerprint(request.screenplay, request.style, request.quality)
+        async with job_dedup.single_flight(fingerprint):
+            existing_job = await job_dedup.find_job(fingerprint)
+            if existing_job:
+                return FilmGenerationResponse(
+                    job_id=existing_job['id'],
+                    status=existing_job['status'],
+                    message="An identical film request is already known. Use the job_id to check progress.",
+                    deduplicated=True
+                )
+            
+            job_dict = new_film_job(request.screenplay, request.style, request.quality)
+            await submit_film_job(job_dict)
+        
+        return FilmGenerationResponse(
+            job_id=job_dict['id'],
+            status=job_dict['status'],
+            message="Film generation started. Use the job_id to check progress."
         )
         
-        # Store in database
-        job_dict = job.model_dump()
-        job_dict['created_at'] = job_dict['created_at'].isoformat()
-        job_dict['updated_at'] = job_dict['updated_at'].isoformat()
-        job_dict['started_at'] = job_dict['started_at'].isoformat()
-        await db.film_jobs.insert_one(job_dict)
+    except Exception as e:
+        logger.error(f"Error starting film generation: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/job/{job_id}/regenerate", response_model=FilmGenerationResponse)
+async def regenerate_film(job_id: str, request: FilmRegenerationRequest):
+    """Regenerate a film from a revised screenplay, reusing unchanged scenes of a previous job"""
+    try:
+        previous_job = await db.film_jobs.find_one(
+            {"id": job_id},
+            {"_id": 0, "status": 1, "style": 1, "quality": 1}
+        )
+        
+        if not previous_job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if previous_job['status'] != 'completed':
+            raise HTTPException(status_code=409, detail="Only completed jobs can be regenerated")
         
-        # Start background processing
-        asyncio.create_task(process_film_generation(job_id, request.screenplay, request.style, request.quality, started_at))
+        style = request.style or previous_job['style']
+        quality = request.quality or previous_job.get('quality', 'medium')
+        
+        job_dict = new_film_job(request.screenplay, style, quality, parent_job_id=job_id)
+        await submit_film_job(job_dict)
         
         return FilmGenerationResponse(
-            job_id=job_id,
-            status="processing",
-            message="Film generation started. Use the job_id to check progress."
+            job_id=job_dict['id'],
+            status=job_dict['status'],
+            message="Film regeneration started. Only changed scenes will be re-rendered."
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error starting film generation: {str(e)}")
+        logger.error(f"Error starting film regeneration: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/batch/analyze")
+async def batch_analyze(request: BatchAnalysisRequest):
+    """Parse and analyze many screenplays on all cores, streaming one JSON line per screenplay"""
+    async def results():
+        start = time.monotonic()
+        analyzed = 0
+        
+        async for result in batch_analyzer.analyze((item.screenplay, item.style) for item in request.screenplays):
+            item = request.screenplays[result['index']]
+            line = {'type': 'result', 'index': result['index'], 'name': item.name}
+            
+            if 'error' in result:
+                line['error'] = result['error']
+            else:
+                analyzed += 1
+                line.update({
+                    'scene_count': result['scene_count'],
+                    'characters': result['characters'],
+                    'analysis_time': result['analysis_time']
+                })
+                if request.include_scenes:
+                    line['scenes'] = result['scenes']
+                if request.enqueue:
+                    job_dict = new_film_job(item.screenplay, item.style, item.quality, analyzed_scenes=result['scenes'])
+                    # Inline jobs share this process; waiting for a slot holds back the rest of the batch
+                    await submit_film_job(job_dict, slots=batch_job_slots)
+                    line['job_id'] = job_dict['id']
+            
+            yield json.dumps(line) + "\n"
+        
+        duration = time.monotonic() - start
+        yield json.dumps({
+            'type': 'summary',
+            'scripts': len(request.screenplays),
+            'analyzed': analyzed,
+            'failed': len(request.screenplays) - analyzed,
+            'duration': duration,
+            'scripts_per_minute': analyzed * 60 / duration if duration else 0.0
+        }) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @api_router.get("/job/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
     """Get the status of a film generation job"""
     try:
-        job = await db.film_jobs.find_one({"id": job_id}, {"_id": 0})
+        # Count scenes on the server instead of loading them
+        jobs = await db.film_jobs.aggregate([
+            {"$match": {"id": job_id}},
+            {"$limit": 1},
+            {"$project": {**JOB_STATUS_PROJECTION, "scenes_count": {"$size": {"$ifNull": ["$scenes", []]}}}}
+        ]).to_list(1)
+        job = jobs[0] if jobs else None
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -177,7 +421,7 @@ async def get_job_status(job_id: str):
             job_id=job['id'],
             status=job['status'],
             progress=job['progress'],
-            scenes_count=len(job.get('scenes', [])),
+            scenes_count=job['scenes_count'],
             message=f"Job is {job['status']}",
             video_urls=video_urls,
             export_info=job.get('export_info'),
@@ -185,7 +429,8 @@ async def get_job_status(job_id: str):
             generation_duration=job.get('generation_duration'),
             total_file_size=job.get('total_file_size'),
             started_at=job.get('started_at'),
-            completed_at=job.get('completed_at')
+            completed_at=job.get('completed_at'),
+            metrics=job.get('metrics')
         )
         
     except HTTPException:
@@ -194,11 +439,54 @@ async def get_job_status(job_id: str):
         logger.error(f"Error getting job status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/job/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Stream job progress as server-sent events until the job finishes"""
+    # Subscribe before reading the current state so no event is missed in between
+    queue = progress_broker.subscribe(job_id)
+    try:
+        job = await fetch_job_progress(job_id)
+    except Exception as e:
+        progress_broker.unsubscribe(job_id, queue)
+        logger.error(f"Error getting job status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not job:
+        progress_broker.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        try:
+            snapshot = {'type': 'status', 'job_id': job_id, 'status': job['status'],
+                        'progress': job.get('progress', 0), 'error': job.get('error')}
+            yield ProgressBroker.format_sse(snapshot)
+            if ProgressBroker.is_terminal(snapshot):
+                return
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                yield ProgressBroker.format_sse(event)
+                if ProgressBroker.is_terminal(event):
+                    break
+        finally:
+            progress_broker.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.get("/job/{job_id}/scenes")
 async def get_job_scenes(job_id: str):
     """Get all scenes for a job with video URLs"""
     try:
-        job = await db.film_jobs.find_one({"id": job_id}, {"_id": 0})
+        job = await db.film_jobs.find_one({"id": job_id}, {"_id": 0, "scenes": 1, "export_info": 1})
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -216,21 +504,74 @@ async def get_job_scenes(job_id: str):
         logger.error(f"Error getting job scenes: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/job/{job_id}/timeline")
+async def get_job_timeline(job_id: str, at: Optional[float] = None):
+    """Get a job's timeline, or with ?at=<seconds> only the scene and dialog playing at that time"""
+    try:
+        # Completed timelines never change, so their index is built once per job
+        index = timeline_manager.cached_index(job_id) if at is not None else None
+        if index is None:
+            job = await db.film_jobs.find_one({"id": job_id}, {"_id": 0, "status": 1, "timeline": 1})
+            
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            
+            timeline = job.get('timeline', [])
+            if at is None:
+                return {"job_id": job_id, **timeline_manager.get_timeline_info(timeline)}
+            
+            if job.get('status') == 'completed':
+                index = timeline_manager.index_job(job_id, timeline)
+            else:
+                index = timeline_manager.build_index(timeline)
+        
+        return {
+            "job_id": job_id,
+            "at": at,
+            "total_duration": index.duration,
+            "playing": index.at(at)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job timeline: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/media/{ref}")
+async def get_media(ref: str, request: Request):
+    """Serve a media store object (stored scene videos, assembled films, dialog clips) with Range support"""
+    if not REF_PATTERN.match(ref) or not media_store.exists(ref):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return media_file_response(request, media_store.path_for(ref), etag=ref.split('.')[0])
+
 @api_router.get("/job/{job_id}/download/{scene_number}")
-async def download_scene(job_id: str, scene_number: int):
-    """Redirect to direct video URL for a specific scene"""
+async def download_scene(job_id: str, scene_number: int, request: Request):
+    """Serve the stored copy of a scene video, or redirect to its direct video URL"""
     try:
-        job = await db.film_jobs.find_one({"id": job_id}, {"_id": 0})
+        # Fetch only the requested scene
+        job = await db.film_jobs.find_one(
+            {"id": job_id},
+            {"_id": 0, "id": 1, "scenes": {"$elemMatch": {"scene_number": scene_number}}}
+        )
         
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         scenes = job.get('scenes', [])
-        scene = next((s for s in scenes if s['scene_number'] == scene_number), None)
+        scene = scenes[0] if scenes else None
         
         if not scene:
             raise HTTPException(status_code=404, detail="Scene not found")
         
+        stored_url = scene.get('stored_video_url')
+        if stored_url and stored_url.startswith('/api/media/'):
+            ref = stored_url.rsplit('/', 1)[1]
+            if media_store.exists(ref):
+                return media_file_response(request, media_store.path_for(ref), etag=ref.split('.')[0])
+        elif stored_url:
+            return RedirectResponse(url=stored_url)
+        
         video_url = scene.get('video_url')
         if not video_url or video_url.startswith('placeholder'):
             raise HTTPException(status_code=404, detail="Video not available")
@@ -244,110 +585,227 @@ async def download_scene(job_id: str, scene_number: int):
         logger.error(f"Error downloading scene: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def process_film_generation(job_id: str, screenplay: str, style: str, quality: str, started_at: datetime):
+def new_film_job(screenplay: str, style: str, quality: str, parent_job_id: Optional[str] = None,
+                 analyzed_scenes: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Create the document for a new film job
+    
+    analyzed_scenes are the screenplay's scenes, already parsed and analyzed
+    for this style; the job then skips both steps.
+    """
+    job = FilmJob(
+        screenplay=screenplay,
+        style=style,
+        quality=quality,
+        status="processing",
+        progress=0,
+        started_at=datetime.now(timezone.utc),
+        parent_job_id=parent_job_id,
+        fingerprint=JobDeduplicator.make_fingerprint(screenplay, style, quality)
+    )
+    
+    job_dict = job.model_dump()
+    job_dict['created_at'] = job_dict['created_at'].isoformat()
+    job_dict['updated_at'] = job_dict['updated_at'].isoformat()
+    job_dict['started_at'] = job_dict['started_at'].isoformat()
+    if analyzed_scenes is not None:
+        job_dict['analyzed_scenes'] = analyzed_scenes
+    return job_dict
+
+async def submit_film_job(job_dict: Dict[str, Any], slots: Optional[asyncio.Semaphore] = None):
+    """Store a new job and start it, either in this process or through the job queue
+    
+    In inline mode, slots limits how many of the jobs submitted with it run
+    at once; submitting then waits for a free slot.
+    """
+    if JOB_RUNNER == 'queue':
+        job_dict.update(job_queue.queue_fields())
+        await db.film_jobs.insert_one(job_dict)
+        return
+    
+    if slots:
+        await slots.acquire()
+    try:
+        await db.film_jobs.insert_one(job_dict)
+    except BaseException:
+        if slots:
+            slots.release()
+        raise
+    
+    # Start background processing
+    asyncio.create_task(run_inline_film_job(job_dict, slots))
+
+async def run_inline_film_job(job: Dict[str, Any], slots: Optional[asyncio.Semaphore] = None):
+    try:
+        await run_film_job(job)
+    finally:
+        if slots:
+            slots.release()
+
+async def run_film_job(job: Dict[str, Any]):
+    """Run a stored job through the generation pipeline"""
+    started_at = job['started_at']
+    if isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at)
+    
+    if job.get('parent_job_id'):
+        await process_film_regeneration(job['id'], job['parent_job_id'], job['screenplay'], job['style'], job['quality'], started_at)
+    else:
+        await process_film_generation(job['id'], job['screenplay'], job['style'], job['quality'], started_at,
+                                      analyzed_scenes=job.get('analyzed_scenes'))
+
+async def load_reusable_scenes(parent_job_id: str, style: str, quality: str) -> List[Dict[str, Any]]:
+    """Load a previous job's scenes if their results can be reused"""
+    parent_job = await db.film_jobs.find_one(
+        {"id": parent_job_id},
+        {"_id": 0, "style": 1, "quality": 1, "scenes": 1, "completed_at": 1}
+    )
+    
+    # Scene results depend on style and quality, so only reuse them if both are unchanged
+    if not parent_job or parent_job['style'] != style or parent_job.get('quality', 'medium') != quality:
+        return []
+    
+    # Provider video URLs expire like render cache entries do; past that age every scene is rendered again
+    completed_at = parent_job.get('completed_at')
+    if render_cache.ttl_seconds and completed_at:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(completed_at)
+        if age.total_seconds() > render_cache.ttl_seconds:
+            logger.info(f"Scene videos of job {parent_job_id} have expired; reprocessing all scenes")
+            return []
+    return parent_job.get('scenes', [])
+
+async def process_film_generation(job_id: str, screenplay: str, style: str, quality: str, started_at: datetime,
+                                  analyzed_scenes: Optional[List[Dict[str, Any]]] = None):
     """Background task to process film generation"""
     try:
         logger.info(f"Starting film generation for job {job_id}")
         
+        if analyzed_scenes is not None:
+            # Parsed and analyzed beforehand by batch analysis
+            result = await produce_scenes(job_id, analyzed_scenes, style, quality, analyzed=True)
+            await complete_film_job(job_id, result['scenes'], started_at, result['metrics'])
+            return
+        
         # Update progress: Parsing
         await update_job_progress(job_id, 10, "Parsing screenplay...")
-        scenes = scene_parser.parse(screenplay)
-        
-        # Update progress: Building scenes
-        await update_job_progress(job_id, 20, "Building scene descriptions...")
-        scenes = scene_builder.build_scenes(scenes, style)
-        
-        # Update progress: Analyzing characters
-        await update_job_progress(job_id, 30, "Analyzing characters...")
-        characters = character_ai.extract_characters(scenes)
-        voice_ai.assign_voices(characters)
-        
-        # Update progress: Camera setup
-        await update_job_progress(job_id, 40, "Setting up cameras...")
-        scenes = camera_ai.apply_camera_to_scenes(scenes)
-        
-        # Update progress: Lighting
-        await update_job_progress(job_id, 50, "Configuring lighting...")
-        scenes = lighting_ai.apply_lighting_to_scenes(scenes)
-        
-        # Update progress: Sound design
-        await update_job_progress(job_id, 60, "Designing sound...")
-        scenes = sound_ai.apply_sound_to_scenes(scenes)
-        
-        # Update progress: Generating voices
-        await update_job_progress(job_id, 70, "Generating AI voices...")
-        for scene in scenes:
-            audio_clips = await voice_ai.generate_scene_audio(scene)
-            scene['audio_clips'] = [{
-                'character': clip['character'],
-                'text': clip['text'],
-                'voice': clip['voice']
-            } for clip in audio_clips]
-        
-        # Update progress: Rendering videos
-        await update_job_progress(job_id, 80, "Rendering scene videos...")
-        scenes = await render_engine.render_all_scenes(scenes, style, quality)
-        
-        # Calculate total file size
-        total_file_size = sum(scene.get('file_size', 0) for scene in scenes)
-        
-        # Update progress: Creating timeline
-        await update_job_progress(job_id, 90, "Creating timeline...")
-        timeline = timeline_manager.create_timeline(scenes)
-        
-        # Update progress: Exporting
-        await update_job_progress(job_id, 95, "Exporting film...")
-        export_info = await export_module.export_film(scenes, timeline)
-        export_info['total_file_size'] = total_file_size
-        
-        # Calculate generation duration
-        completed_at = datetime.now(timezone.utc)
-        generation_duration = (completed_at - started_at).total_seconds()
-        
-        # Complete
-        await db.film_jobs.update_one(
-            {"id": job_id},
-            {
-                "$set": {
-                    "status": "completed",
-                    "progress": 100,
-                    "scenes": scenes,
-                    "timeline": timeline,
-                    "export_info": export_info,
-                    "completed_at": completed_at.isoformat(),
-                    "generation_duration": generation_duration,
-                    "total_file_size": total_file_size,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
         
-        logger.info(f"Film generation completed for job {job_id} in {generation_duration:.2f}s")
+        # Scenes go through the pipeline as soon as they are parsed
+        result = await produce_scenes(job_id, scene_parser.iter_scenes(screenplay), style, quality)
+        await complete_film_job(job_id, result['scenes'], started_at, result['metrics'])
         
     except Exception as e:
-        logger.error(f"Error in film generation: {str(e)}")
-        await db.film_jobs.update_one(
-            {"id": job_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error": str(e),
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
+        await fail_film_job(job_id, e)
 
-async def update_job_progress(job_id: str, progress: int, message: str):
-    """Update job progress in database"""
-    await db.film_jobs.update_one(
-        {"id": job_id},
+async def process_film_regeneration(job_id: str, parent_job_id: str, screenplay: str, style: str, quality: str,
+                                    started_at: datetime):
+    """Background task to regenerate a film, reprocessing only changed scenes"""
+    try:
+        logger.info(f"Starting incremental film generation for job {job_id} from job {parent_job_id}")
+        previous_scenes = await load_reusable_scenes(parent_job_id, style, quality)
+        
+        # Update progress: Parsing
+        await update_job_progress(job_id, 10, "Parsing revised screenplay...")
+        revised_scenes = scene_parser.parse(screenplay)
+        diff = scene_differ.diff(previous_scenes, revised_scenes)
+        scenes = diff['scenes']
+        changed_scenes = [scenes[i] for i in diff['changed']]
+        
+        await progress_writer.update(job_id, {
+            "changed_scenes": [scene['scene_number'] for scene in changed_scenes],
+            "reused_scenes": len(scenes) - len(changed_scenes)
+        })
+        
+        metrics = None
+        if changed_scenes:
+            result = await produce_scenes(job_id, changed_scenes, style, quality, cast_scenes=scenes)
+            metrics = result['metrics']
+        
+        await complete_film_job(job_id, scenes, started_at, metrics)
+        
+    except Exception as e:
+        await fail_film_job(job_id, e)
+
+async def produce_scenes(job_id: str, scenes: Iterable[Dict[str, Any]], style: str, quality: str,
+                         cast_scenes: Optional[List[Dict[str, Any]]] = None, analyzed: bool = False) -> Dict[str, Any]:
+    """Run scenes through the streaming analysis, voice and render pipeline
+    
+    cast_scenes is the full scene list of the film, used for voice casting
+    when only some scenes are being processed. analyzed skips the analysis
+    of scenes that were analyzed beforehand.
+    """
+    last_progress = 10
+    
+    async def publish_scene(scene: Dict[str, Any], rendered_count: int, scene_count: int):
+        nonlocal last_progress
+        # The scene count grows while the screenplay is still being parsed; never report less progress
+        last_progress = max(last_progress, 10 + (80 * rendered_count) // scene_count)
+        await update_job_progress(job_id, last_progress,
+                                  f"Rendered scene {scene['scene_number']} ({rendered_count}/{scene_count})")
+        progress_broker.publish(job_id, {
+            'type': 'scene',
+            'job_id': job_id,
+            'scene_number': scene['scene_number'],
+            'render_status': scene.get('render_status'),
+            'video_url': scene.get('video_url'),
+            'render_cache_hit': scene.get('render_cache_hit', False)
+        })
+    
+    return await film_pipeline.run(scenes, style, quality, cast_scenes=cast_scenes, analyzed=analyzed,
+                                   on_scene_rendered=publish_scene)
+
+async def complete_film_job(job_id: str, scenes: List[Dict[str, Any]], started_at: datetime,
+                            metrics: Optional[Dict[str, Any]] = None):
+    """Build timeline and export for rendered scenes, then mark the job completed"""
+    # Calculate total file size
+    total_file_size = sum(scene.get('file_size', 0) for scene in scenes)
+    render_cache_hits = sum(1 for scene in scenes if scene.get('render_cache_hit'))
+    
+    # Update progress: Creating timeline
+    await update_job_progress(job_id, 90, "Creating timeline...")
+    timeline = timeline_manager.create_timeline(scenes)
+    
+    # Update progress: Exporting
+    await update_job_progress(job_id, 95, "Exporting film...")
+    export_info = await export_module.export_film(scenes, timeline, job_id)
+    export_info['total_file_size'] = total_file_size
+    
+    # Calculate generation duration
+    completed_at = datetime.now(timezone.utc)
+    generation_duration = (completed_at - started_at).total_seconds()
+    
+    # Complete
+    await progress_writer.update(
+        job_id,
         {
-            "$set": {
-                "progress": progress,
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }
-        }
+            "status": "completed",
+            "progress": 100,
+            "scenes": scenes,
+            "timeline": timeline,
+            "export_info": export_info,
+            "completed_at": completed_at.isoformat(),
+            "generation_duration": generation_duration,
+            "total_file_size": total_file_size,
+            "render_cache_hits": render_cache_hits,
+            "metrics": metrics or {}
+        },
+        final=True,
+        # Batch analysis results are only needed until the job has run
+        unset=["analyzed_scenes"]
     )
+    
+    timeline_manager.index_job(job_id, timeline)
+    progress_broker.publish(job_id, {'type': 'status', 'job_id': job_id, 'status': 'completed', 'progress': 100})
+    logger.info(f"Film generation completed for job {job_id} in {generation_duration:.2f}s")
+
+async def fail_film_job(job_id: str, error: Exception):
+    """Mark a job as failed"""
+    logger.error(f"Error in film generation: {str(error)}")
+    await progress_writer.update(job_id, {"status": "failed", "error": str(error)}, final=True, unset=["analyzed_scenes"])
+    progress_broker.publish(job_id, {'type': 'status', 'job_id': job_id, 'status': 'failed', 'error': str(error)})
+
+async def update_job_progress(job_id: str, progress: int, message: str):
+    """Update job progress in database (coalesced and rate limited)"""
+    await progress_writer.update(job_id, {"progress": progress})
+    progress_broker.publish(job_id, {'type': 'progress', 'job_id': job_id, 'progress': progress, 'message': message})
     logger.info(f"Job {job_id}: {progress}% - {message}")
 
 # Include the router in the main app
@@ -361,6 +819,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def collect_media_garbage() -> Dict[str, int]:
+    """Delete dialog clips no longer referenced by any job or audio cache entry"""
+    keep = await asyncio.to_thread(audio_cache.referenced_refs)
+    async for job in db.film_jobs.find({}, {"_id": 0, "scenes.audio_clips.audio_ref": 1}):
+        for scene in job.get('scenes', []):
+            keep.update(clip['audio_ref'] for clip in scene.get('audio_clips', []) if clip.get('audio_ref'))
+    
+    result = await asyncio.to_thread(media_store.collect, keep, 'mp3', MEDIA_GC_GRACE_SECONDS)
+    if result['deleted']:
+        logger.info(f"Media GC deleted {result['deleted']} clips ({result['bytes_freed']} bytes)")
+    return result
+
+async def run_media_gc():
+    while True:
+        try:
+            await collect_media_garbage()
+        except Exception as e:
+            logger.error(f"Error collecting media garbage: {str(e)}")
+        await asyncio.sleep(MEDIA_GC_INTERVAL_SECONDS)
+
+media_gc_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_media_gc():
+    global media_gc_task
+    if MEDIA_GC_INTERVAL_SECONDS > 0:
+        media_gc_task = asyncio.create_task(run_media_gc())
+
+@app.on_event("startup")
+async def create_indexes():
+    async def film_job_indexes():
+        await db.film_jobs.create_index("id", unique=True)
+        await db.film_jobs.create_index("status")
+        await db.film_jobs.create_index([("created_at", -1)])
+    
+    # A failing group (e.g. a conflicting existing index) must not keep the others from being created
+    index_groups = [
+        ("film job", film_job_indexes),
+        ("render cache", render_cache.ensure_indexes),
+        ("job queue", job_queue.ensure_indexes),
+        ("job dedup", job_dedup.ensure_indexes)
+    ]
+    for name, ensure_indexes in index_groups:
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Could not create {name} indexes: {str(e)}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if media_gc_task:
+        media_gc_task.cancel()
+    await progress_writer.flush_all()
     client.close()
+    replicate_executor.shutdown()
+    tts_executor.shutdown()
+    batch_analyzer.shutdown()
+    await download_manager.aclose()
@@ -0,0 +1,136 @@
+"""Film generation worker
+
+Claims queued jobs from MongoDB and runs them through the same pipeline as
+the API. Start any number of these next to the API (JOB_RUNNER=queue):
+    
+    python worker.py
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+
+from server import job_queue, run_film_job, shutdown_db_client
+
+logger = logging.getLogger("worker")
+
+WORKER_CONCURRENCY = int(os.environ.get('WORKER_CONCURRENCY', '2'))
+WORKER_POLL_INTERVAL = float(os.environ.get('WORKER_POLL_INTERVAL', '2'))
+
+class FilmWorker:
+    """Claims jobs from the queue and keeps their leases alive while running"""
+    
+    def __init__(self, concurrency: int = 2, poll_interval: float = 2.0):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.running = {}
+        self._stopping = asyncio.Event()
+    
+    async def run(self):
+        """Claim and run jobs until stopped"""
+        await job_queue.ensure_indexes()
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        
+        while await self._wait_for_slot(slots):
+            try:
+                await job_queue.fail_exhausted()
+                job = await job_queue.claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+            
+            if job and self._stopping.is_set():
+                # Stopped while claiming: hand the job straight back
+                await job_queue.requeue(job['id'], self.worker_id)
+                slots.release()
+                break
+            
+            if not job:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            task = asyncio.create_task(self._run_job(job))
+            self.running[job['id']] = task
+            task.add_done_callback(lambda _, job_id=job['id']: (self.running.pop(job_id, None), slots.release()))
+        
+        await self._shutdown()
+    
+    def stop(self):
+        self._stopping.set()
+    
+    async def _wait_for_slot(self, slots: asyncio.Semaphore) -> bool:
+        """Wait for a free slot; returns False instead if the worker is stopped first"""
+        if self._stopping.is_set():
+            return False
+        acquire = asyncio.create_task(slots.acquire())
+        stopping = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait({acquire, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopping.cancel()
+            if self._stopping.is_set() or not acquire.done():
+                acquire.cancel()
+                try:
+                    await acquire
+                    slots.release()  # Acquired just before stopping
+                except asyncio.CancelledError:
+                    pass
+        return not self._stopping.is_set()
+    
+    async def _run_job(self, job):
+        """Run one job with a heartbeat task extending its lease"""
+        job_id = job['id']
+        job_task = asyncio.create_task(run_film_job(job))
+        
+        try:
+            interval = max(1.0, job_queue.lease_seconds / 3)
+            while True:
+                done, _ = await asyncio.wait({job_task}, timeout=interval)
+                if done:
+                    break
+                if not await job_queue.heartbeat(job_id, self.worker_id):
+                    # Another worker took over after our lease expired
+                    logger.warning(f"Lost lease on job {job_id}, abandoning it")
+                    job_task.cancel()
+                    await asyncio.gather(job_task, return_exceptions=True)
+                    break
+        except asyncio.CancelledError:
+            # Let the job unwind before another worker can claim it
+            job_task.cancel()
+            await asyncio.gather(job_task, return_exceptions=True)
+            await job_queue.requeue(job_id, self.worker_id)
+            raise
+        finally:
+            await job_queue.release(job_id, self.worker_id)
+    
+    async def _shutdown(self):
+        """Hand unfinished jobs back to the queue"""
+        for task in list(self.running.values()):
+            task.cancel()
+        if self.running:
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+async def main():
+    worker = FilmWorker(concurrency=WORKER_CONCURRENCY, poll_interval=WORKER_POLL_INTERVAL)
+    
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    
+    try:
+        await worker.run()
+    finally:
+        # Same shutdown as the API: flush coalesced progress, then close clients and pools
+        await shutdown_db_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
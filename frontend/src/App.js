@@ -53,8 +53,8 @@ function App() {
       setJobId(job_id);
       toast.success("Filmgenerierung gestartet!");
 
-      // Poll for status
-      pollJobStatus(job_id);
+      // Follow progress via server-sent events
+      watchJob(job_id);
     } catch (error) {
       console.error("Error starting generation:", error);
       toast.error("Fehler beim Starten der Generierung");
@@ -62,6 +62,66 @@ function App() {
     }
   };
 
+  const handleJobFinished = (jobData, id) => {
+    setProgress(jobData.progress);
+    setStatus(jobData.status);
+
+    if (jobData.status === "completed") {
+      setIsGenerating(false);
+      setExportInfo(jobData.export_info);
+      setGenerationDuration(jobData.generation_duration);
+      toast.success("Film erfolgreich generiert!");
+      
+      // Fetch scenes
+      fetchScenes(id);
+    } else if (jobData.status === "failed") {
+      setIsGenerating(false);
+      toast.error(`Filmgenerierung fehlgeschlagen: ${jobData.error || 'Unbekannter Fehler'}`);
+    }
+  };
+
+  const watchJob = (id) => {
+    if (typeof EventSource === "undefined") {
+      pollJobStatus(id);
+      return;
+    }
+
+    const source = new EventSource(`${API}/job/${id}/events`);
+    let finished = false;
+
+    const onEvent = async (event) => {
+      const data = JSON.parse(event.data);
+      if (data.progress !== undefined && data.progress !== null) {
+        setProgress(data.progress);
+      }
+      if (data.status) {
+        setStatus(data.status);
+      }
+
+      if (data.status === "completed" || data.status === "failed") {
+        finished = true;
+        source.close();
+        // The stream carries progress only; load the final job details once
+        try {
+          const response = await axios.get(`${API}/job/${id}`);
+          handleJobFinished(response.data, id);
+        } catch (error) {
+          console.error("Error loading job result:", error);
+        }
+      }
+    };
+
+    source.addEventListener("status", onEvent);
+    source.addEventListener("progress", onEvent);
+    source.onerror = () => {
+      if (!finished) {
+        // Stream unavailable (e.g. proxy without SSE support): fall back to polling
+        source.close();
+        pollJobStatus(id);
+      }
+    };
+  };
+
   const pollJobStatus = async (id) => {
     const interval = setInterval(async () => {
       try {
@@ -71,19 +131,9 @@ function App() {
         setProgress(jobData.progress);
         setStatus(jobData.status);
 
-        if (jobData.status === "completed") {
-          clearInterval(interval);
-          setIsGenerating(false);
-          setExportInfo(jobData.export_info);
-          setGenerationDuration(jobData.generation_duration);
-          toast.success("Film erfolgreich generiert!");
-          
-          // Fetch scenes
-          fetchScenes(id);
-        } else if (jobData.status === "failed") {
+        if (jobData.status === "completed" || jobData.status === "failed") {
           clearInterval(interval);
-          setIsGenerating(false);
-          toast.error(`Filmgenerierung fehlgeschlagen: ${jobData.error || 'Unbekannter Fehler'}`);
+          handleJobFinished(jobData, id);
         }
       } catch (error) {
         console.error("Error polling status:", error);
@@ -0,0 +1,50 @@
+"""AudioCache keeps its clips within the byte budget and MediaStore.collect removes clips nothing references."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from modules.audio_cache import AudioCache
+from modules.media_store import MediaStore
+
+CLIP_SIZE = 1000
+
+def store_clip(media_store, text):
+    return media_store.put(text.encode().ljust(CLIP_SIZE, b'\0'), 'mp3')
+
+def age(media_store, ref, seconds):
+    path = media_store.path_for(ref)
+    mtime = os.stat(path).st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    media_store = MediaStore(str(tmp_path / 'media'))
+    cache = AudioCache(media_store, str(tmp_path / 'index'), max_disk_bytes=2 * CLIP_SIZE)
+    for text in ['one', 'two']:
+        cache.put(text, store_clip(media_store, text), 1.0)
+    assert cache.get('one')  # 'two' is now least recently used
+    cache.put('three', store_clip(media_store, 'three'), 1.0)
+    
+    assert cache.get('two') is None
+    assert cache.get('one') and cache.get('three')
+    assert cache.get_stats()['disk_bytes'] == 2 * CLIP_SIZE
+    # The budget also applies when the index is reloaded with a smaller one
+    reloaded = AudioCache(media_store, str(tmp_path / 'index'), max_disk_bytes=CLIP_SIZE)
+    assert reloaded.get_stats()['entries'] == 1
+
+def test_collect_deletes_unreferenced_clips(tmp_path):
+    media_store = MediaStore(str(tmp_path / 'media'))
+    cache = AudioCache(media_store, str(tmp_path / 'index'), max_disk_bytes=CLIP_SIZE)
+    cached, evicted, in_job, recent = (store_clip(media_store, text) for text in ['cached', 'evicted', 'in job', 'recent'])
+    cache.put('evicted', evicted, 1.0)
+    cache.put('cached', cached, 1.0)
+    for ref in [cached, evicted, in_job]:
+        age(media_store, ref, 3600)
+    
+    keep = cache.referenced_refs() | {in_job}
+    result = media_store.collect(keep, 'mp3', min_age_seconds=60)
+    
+    assert result == {'deleted': 1, 'bytes_freed': CLIP_SIZE}
+    assert not media_store.exists(evicted)
+    assert all(media_store.exists(ref) for ref in [cached, in_job, recent])
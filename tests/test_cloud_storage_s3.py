@@ -0,0 +1,114 @@
+"""CloudStorageManager S3 uploads, listing and batch deletes against moto's in-process S3; skipped without moto."""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+moto = pytest.importorskip('moto')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from modules import cloud_storage
+from modules.cloud_storage import CloudStorageManager, MIN_PART_SIZE
+
+BUCKET = 'test-films'
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    with moto.mock_aws():
+        manager = CloudStorageManager('aws_s3', {
+            'bucket_name': BUCKET,
+            'region': 'us-east-1',
+            'part_size': MIN_PART_SIZE,
+            'multipart_threshold': MIN_PART_SIZE,
+            'max_concurrency': 2
+        })
+        manager._s3().create_bucket(Bucket=BUCKET)
+        yield manager
+
+class Source:
+    """Async chunk source that records whether it was closed"""
+    
+    def __init__(self, data: bytes, chunk_size: int = 1024 * 1024, fail_after: int = None):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+        self.closed = False
+    
+    async def chunks(self):
+        try:
+            for offset in range(0, len(self.data), self.chunk_size):
+                if self.fail_after is not None and offset >= self.fail_after:
+                    raise IOError("source failed")
+                yield self.data[offset:offset + self.chunk_size]
+        finally:
+            self.closed = True
+
+def stored(manager, key: str) -> bytes:
+    return manager._s3().get_object(Bucket=BUCKET, Key=key)['Body'].read()
+
+def test_small_upload_uses_single_request(manager):
+    data = os.urandom(100 * 1024)
+    url = asyncio.run(manager.upload_stream(Source(data).chunks(), 'films/small.mp4'))
+    
+    assert url.endswith('/films/small.mp4')
+    assert stored(manager, 'films/small.mp4') == data
+    assert manager.parts_uploaded == 0
+
+def test_large_upload_uses_parts(manager):
+    data = os.urandom(2 * MIN_PART_SIZE + 1024)
+    asyncio.run(manager.upload_stream(Source(data).chunks(), 'films/large.mp4'))
+    
+    assert stored(manager, 'films/large.mp4') == data
+    assert manager.parts_uploaded == 3
+
+def test_failed_source_aborts_multipart_upload(manager):
+    source = Source(os.urandom(3 * MIN_PART_SIZE), fail_after=2 * MIN_PART_SIZE)
+    with pytest.raises(IOError):
+        asyncio.run(manager.upload_stream(source.chunks(), 'films/broken.mp4'))
+    
+    assert not manager._s3().list_multipart_uploads(Bucket=BUCKET).get('Uploads')
+    assert source.closed
+
+def test_failed_upload_closes_source(manager):
+    source = Source(os.urandom(3 * MIN_PART_SIZE))
+    manager.config['bucket_name'] = 'missing-bucket'
+    
+    async def upload():
+        with pytest.raises(Exception):
+            await manager.upload_stream(source.chunks(), 'films/lost.mp4')
+        # Closed by the upload itself, not by the event loop shutting down
+        return source.closed
+    
+    assert asyncio.run(upload())
+
+def put_objects(manager, keys):
+    for key in keys:
+        manager._s3().put_object(Bucket=BUCKET, Key=key, Body=b'x')
+
+async def listed(manager, prefix: str):
+    return sorted([item['path'] async for item in manager.iter_files(prefix)])
+
+def test_iter_files_lists_prefix(manager):
+    put_objects(manager, ['films/a/1.mp4', 'films/a/2.mp4', 'films/b/1.mp4'])
+    
+    assert asyncio.run(listed(manager, 'films/a/')) == ['films/a/1.mp4', 'films/a/2.mp4']
+
+def test_delete_files_uses_batches(manager, monkeypatch):
+    monkeypatch.setattr(cloud_storage, 'DELETE_BATCH_SIZE', 3)
+    keys = [f"films/old/{n}.mp4" for n in range(7)]
+    put_objects(manager, keys + ['films/keep.mp4'])
+    client = manager._s3()
+    requests = []
+    delete_objects = client.delete_objects
+    monkeypatch.setattr(client, 'delete_objects', lambda **kwargs: requests.append(kwargs) or delete_objects(**kwargs))
+    
+    failed = asyncio.run(manager.delete_files(keys))
+    
+    assert failed == []
+    assert [len(request['Delete']['Objects']) for request in requests] == [3, 3, 1]
+    assert manager.files_deleted == 7
+    assert asyncio.run(listed(manager, 'films/')) == ['films/keep.mp4']
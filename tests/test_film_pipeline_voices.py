@@ -0,0 +1,72 @@
+"""Voice casting in FilmPipeline stays collision-free when a film is regenerated."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from modules.character_ai import cast_voices
+from modules.film_pipeline import FilmPipeline
+from modules.scene_diff import SceneDiffer
+
+VOICES = ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']
+
+class FakeVoiceAI:
+    """Real voice casting; clips only record the voice they were spoken with"""
+    
+    max_concurrent_requests = 4
+    
+    def assign_voices(self, characters, taken=()):
+        return cast_voices(characters, VOICES, taken)
+    
+    async def generate_scene_audio(self, scene, voice_mapping):
+        return [
+            {'character': dialog['character'], 'text': dialog['text'], 'voice': voice_mapping[dialog['character']]}
+            for dialog in scene['dialogs']
+        ]
+
+class FakeAnalyzer:
+    def analyze(self, scene, style):
+        return scene
+
+class FakeRenderEngine:
+    max_job_concurrency = 2
+    
+    async def render_scene(self, scene, style, quality):
+        scene['render_status'] = 'completed'
+        return scene
+
+def make_scene(scene_number, lines):
+    return {
+        'scene_number': scene_number,
+        'location': f"LOCATION {scene_number}",
+        'characters': sorted({character for character, _ in lines}),
+        'dialogs': [{'character': character, 'text': text} for character, text in lines],
+        'actions': []
+    }
+
+def screenplay(last_line):
+    return [
+        make_scene(1, [('ANNA', 'Hello.'), ('BEN', 'Hi.'), ('CARL', 'Hey.')]),
+        make_scene(2, [('DORA', 'Where?'), ('EVA', 'Here.')]),
+        make_scene(3, [('GUS', last_line), ('ANNA', 'Go.')])
+    ]
+
+def run(scenes, cast_scenes=None):
+    pipeline = FilmPipeline(FakeAnalyzer(), FakeVoiceAI(), FakeRenderEngine())
+    return asyncio.run(pipeline.run(scenes, cast_scenes=cast_scenes))
+
+def test_regeneration_keeps_voices_distinct():
+    first = run(screenplay('Wait.'))
+    assert len(set(first['voice_mapping'].values())) == len(VOICES)
+    
+    # Only scene 3 changed; GUS appears in no reused scene
+    diff = SceneDiffer().diff(first['scenes'], screenplay('Wait for me.'))
+    changed = [diff['scenes'][index] for index in diff['changed']]
+    assert [scene['scene_number'] for scene in changed] == [3]
+    
+    second = run(changed, cast_scenes=diff['scenes'])
+    
+    assert len(set(second['voice_mapping'].values())) == len(VOICES)
+    assert second['voice_mapping'] == first['voice_mapping']
+    assert {clip['voice'] for clip in changed[0]['audio_clips'] if clip['character'] == 'GUS'} == {first['voice_mapping']['GUS']}
@@ -0,0 +1,27 @@
+"""SceneAnalyzer must reproduce the output of the former SceneBuilder, CameraAI,
+LightingAI and SoundAI modules; the expected JSON was generated with them."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from modules.scene_parser import SceneParser
+from modules.scene_analyzer import SceneAnalyzer
+
+GOLDEN = json.loads((FIXTURES / 'golden_scene_analysis.json').read_text(encoding='utf-8'))
+SCREENPLAY = (FIXTURES / 'golden_screenplay.txt').read_text(encoding='utf-8')
+
+@pytest.mark.parametrize('style', sorted(GOLDEN))
+def test_analyze_matches_golden(style):
+    scenes = SceneParser().parse(SCREENPLAY)
+    analyzer = SceneAnalyzer()
+    analyzed = [analyzer.analyze(scene, style) for scene in scenes]
+    
+    assert [
+        {key: scene[key] for key in ('scene_number', 'visual_description', 'camera_setup', 'lighting_setup', 'sound_design')}
+        for scene in analyzed
+    ] == GOLDEN[style]